@@ -0,0 +1,118 @@
+"""
+Build a FAISS index from the existing Chroma vector database.
+
+The vectors already stored in Chroma are reused, so nothing is re-embedded. The result is
+saved with LangChain's FAISS store, together with the state of the Chroma store it was built
+from; the agent tools search it when VECTOR_BACKEND=faiss and refuse it once Chroma has changed.
+
+Requires the optional faiss group: `uv sync --group faiss`
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import chromadb
+import faiss
+import numpy as np
+from dotenv import load_dotenv
+from langchain.schema import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.utils import DistanceStrategy
+
+load_dotenv()
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from core.settings import settings
+from memory.knowledge_base import COLLECTION_NAME, EMBEDDING_BACKEND_KEY, create_embeddings
+from memory.vector_index import chroma_fingerprint, write_faiss_source
+
+CHROMA_DIR = settings.CHROMA_DB_PATH
+FAISS_INDEX_DIR = settings.FAISS_INDEX_PATH
+# Rows read from Chroma per request
+READ_BATCH_SIZE = 5000
+# Above this many vectors an HNSW graph is built instead of exact (flat) search
+HNSW_THRESHOLD = 10_000
+HNSW_M = 32
+
+
+def _read_collection(collection):
+    """Yield (ids, embeddings, documents, metadatas) pages from a Chroma collection."""
+    for offset in range(0, collection.count(), READ_BATCH_SIZE):
+        page = collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=READ_BATCH_SIZE,
+            offset=offset,
+        )
+        yield page["ids"], page["embeddings"], page["documents"], page["metadatas"]
+
+
+def build_faiss_index(
+    chroma_dir: str = CHROMA_DIR, output_dir: str = FAISS_INDEX_DIR, use_hnsw: bool | None = None
+) -> FAISS:
+    """Copy every vector and document from Chroma into a FAISS store saved in output_dir."""
+    # Taken before reading, so writes made while copying leave the index marked as stale
+    source = chroma_fingerprint(chroma_dir)
+    collection = chromadb.PersistentClient(path=chroma_dir).get_collection(COLLECTION_NAME)
+    total = collection.count()
+    if not total:
+        raise RuntimeError(f"Chroma collection in {chroma_dir} is empty; run the ingest first.")
+    # Queries against the copy have to be embedded the same way as the store's vectors
+    embedding_backend = (collection.metadata or {}).get(EMBEDDING_BACKEND_KEY, "openai")
+
+    if use_hnsw is None:
+        use_hnsw = total > HNSW_THRESHOLD
+
+    index = None
+    docstore = {}
+    index_to_docstore_id = {}
+
+    for ids, vectors, texts, metadatas in _read_collection(collection):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # Inner product on unit vectors is cosine similarity, the metric the Chroma store used
+        faiss.normalize_L2(vectors)
+
+        if index is None:
+            dim = vectors.shape[1]
+            index = (
+                faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+                if use_hnsw
+                else faiss.IndexFlatIP(dim)
+            )
+
+        start = index.ntotal
+        index.add(vectors)
+        for position, (doc_id, text, metadata) in enumerate(zip(ids, texts, metadatas), start):
+            docstore[doc_id] = Document(page_content=text, metadata=metadata or {})
+            index_to_docstore_id[position] = doc_id
+
+    store = FAISS(
+        embedding_function=create_embeddings(embedding_backend),
+        index=index,
+        docstore=InMemoryDocstore(docstore),
+        index_to_docstore_id=index_to_docstore_id,
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+        normalize_L2=True,
+    )
+    store.save_local(output_dir)
+    write_faiss_source(output_dir, source, embedding_backend)
+
+    kind = "HNSW" if use_hnsw else "flat"
+    print(f"Saved {kind} FAISS index with {index.ntotal} vectors to {output_dir}.")
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a FAISS index from the Chroma database")
+    parser.add_argument("--chroma-dir", default=CHROMA_DIR, help="Chroma persist directory")
+    parser.add_argument("--output", default=FAISS_INDEX_DIR, help="Directory for the FAISS index")
+    parser.add_argument(
+        "--hnsw",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=f"Force (or disable) an HNSW index; by default used above {HNSW_THRESHOLD} vectors",
+    )
+    args = parser.parse_args()
+
+    build_faiss_index(args.chroma_dir, args.output, args.hnsw)
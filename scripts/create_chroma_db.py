@@ -1,138 +1,227 @@
+import argparse
+import asyncio
 import os
-import json
 import shutil
+import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain, islice
+from pathlib import Path
 
+import ijson
 from dotenv import load_dotenv
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
-from langchain_community.document_loaders import Docx2txtLoader, PyPDFLoader
-from langchain_openai import OpenAIEmbeddings
+from langchain_community.document_loaders import Docx2txtLoader, PyMuPDFLoader
 from langchain.schema import Document
 
+# The collection settings, chunk ids and symptom documents are shared with
+# scripts/setup_medical_system.py, which writes the same collection
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from memory.knowledge_base import (
+    COLLECTION_NAME,
+    check_collection_metadata,
+    chunk_id,
+    collection_metadata,
+    create_embeddings,
+    symptom_document,
+)
+
 # Load environment variables from the .env file
 load_dotenv()
 
+# Number of chunks per embedding request and Chroma write. Batching across files
+# amortizes the per-call embedding request and index write overhead.
+BATCH_SIZE = 166
+# Upper bound on buffered chunks while streaming; a full buffer is flushed as concurrent batches.
+MAX_PENDING_DOCS = BATCH_SIZE * 8
+# Threads used to parse source files while embedding requests are in flight.
+LOADER_WORKERS = 8
+
+
+def _batched(iterable: Iterable, n: int) -> Iterator[list]:
+    """Yield successive lists of up to n items from iterable."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, n)):
+        yield batch
+
+
+async def _aembed_batches(embeddings, batches):
+    """Embed every batch concurrently, one OpenAI request per batch."""
+    return await asyncio.gather(
+        *(embeddings.aembed_documents([doc.page_content for doc in batch]) for batch in batches)
+    )
+
 
-def process_medical_symptoms_json(json_data):
+def _flush_documents(chroma, embeddings, docs):
+    """
+    Embed documents outside of Chroma and write the precomputed vectors directly.
+    Chunks whose content hash is already stored are skipped without being re-embedded.
+    Remaining documents are split into BATCH_SIZE sublists whose embedding requests run in parallel.
+    """
+    docs_by_id = {}
+    for doc in docs:
+        docs_by_id.setdefault(chunk_id(doc), doc)
+
+    existing_ids = set(chroma._collection.get(ids=list(docs_by_id), include=[])["ids"])
+    new_docs = [(doc_id, doc) for doc_id, doc in docs_by_id.items() if doc_id not in existing_ids]
+    if existing_ids:
+        print(f"Skipped {len(existing_ids)} unchanged chunks")
+    if not new_docs:
+        return
+
+    batches = [new_docs[i:i + BATCH_SIZE] for i in range(0, len(new_docs), BATCH_SIZE)]
+    vectors = asyncio.run(_aembed_batches(embeddings, [[doc for _, doc in batch] for batch in batches]))
+
+    for batch, batch_vectors in zip(batches, vectors):
+        # upsert rather than add so a concurrent ingest of the same chunk can't fail the batch
+        chroma._collection.upsert(
+            ids=[doc_id for doc_id, _ in batch],
+            documents=[doc.page_content for _, doc in batch],
+            metadatas=[doc.metadata for _, doc in batch],
+            embeddings=batch_vectors,
+        )
+        print(f"Added batch of {len(batch)} chunks")
+
+
+def process_medical_symptoms_json(json_data: Iterable[dict]) -> Iterator[Document]:
     """
     Convert medical symptom JSON data into searchable documents.
     Each symptom becomes a separate document with all follow-up questions.
+    Documents are yielded one at a time so the whole dataset is never held in memory.
     """
-    documents = []
-    
     for item in json_data:
-        symptom = item.get("symptom", "")
-        follow_up_questions = item.get("follow_up_questions", {})
-        
-        # Create main content for the symptom
-        content_parts = [f"Medical Symptom: {symptom}"]
-        content_parts.append("=" * 50)
-        
-        # Add all follow-up questions organized by category
-        for category, questions in follow_up_questions.items():
-            category_title = category.replace("_", " ").title()
-            content_parts.append(f"\n{category_title} Questions:")
-            content_parts.append("-" * 30)
-            for i, question in enumerate(questions, 1):
-                content_parts.append(f"{i}. {question}")
-            content_parts.append("")
-        
-        # Combine all content
-        full_content = "\n".join(content_parts)
-        
-        # Create document with rich metadata
-        doc = Document(
-            page_content=full_content,
-            metadata={
-                "symptom": symptom,
-                "source": "medical_symptoms_database",
-                "type": "medical_symptom",
-                "categories": list(follow_up_questions.keys()),
-                "total_questions": sum(len(questions) for questions in follow_up_questions.values())
-            }
-        )
-        documents.append(doc)
-    
-    return documents
+        doc = symptom_document(item)
+        # One document per symptom is already the retrieval unit, so it is never split
+        doc.metadata["_skip_split"] = True
+        yield doc
+
+
+def stream_medical_symptoms_file(file_path: str) -> Iterator[Document]:
+    """
+    Stream-parse a JSON file and yield medical symptom documents.
+    Files whose first array item is not in the medical symptoms format are skipped.
+    """
+    with open(file_path, "rb") as f:
+        items = ijson.items(f, "item")
+        first = next(items, None)
+
+        # Check if it's the medical symptoms format
+        if not (isinstance(first, dict) and
+                "symptom" in first and
+                "follow_up_questions" in first):
+            print(f"Skipping JSON file {os.path.basename(file_path)} - not in medical symptoms format")
+            return
+
+        yield from process_medical_symptoms_json(chain([first], items))
+
+
+def _load_one(file_path: str) -> tuple[str, Iterable[Document] | None]:
+    """Load a single file based on its extension, returning None for unsupported types."""
+    filename = os.path.basename(file_path)
+
+    if filename.endswith(".pdf"):
+        # MuPDF parses in C and releases the GIL, so PDFs load in parallel across the pool
+        return filename, PyMuPDFLoader(file_path).load()
+    if filename.endswith(".docx"):
+        return filename, Docx2txtLoader(file_path).load()
+    if filename.endswith(".json"):
+        # Medical symptom JSON is streamed lazily by the consumer into the batch buffer
+        return filename, stream_medical_symptoms_file(file_path)
+    return filename, None
 
 
 def create_chroma_db(
     folder_path: str,
     db_name: str = "./chroma_db",
-    delete_chroma_db: bool = True,
+    delete_chroma_db: bool = False,
     chunk_size: int = 2000,
     overlap: int = 500,
+    embedding_backend: str = "openai",
 ):
-    embeddings = OpenAIEmbeddings(api_key=os.environ["OPENAI_API_KEY"])
+    embeddings = create_embeddings(embedding_backend)
 
-    # Initialize Chroma vector store
+    # Initialize Chroma vector store. Chunks are keyed by content hash, so by default an
+    # existing store is updated incrementally; delete it only when a full rebuild is requested.
     if delete_chroma_db and os.path.exists(db_name):
         shutil.rmtree(db_name)
         print(f"Deleted existing database at {db_name}")
 
     chroma = Chroma(
+        collection_name=COLLECTION_NAME,
         embedding_function=embeddings,
         persist_directory=f"./{db_name}",
+        collection_metadata=collection_metadata(embedding_backend),
     )
+    # An existing store keeps its own settings; adding vectors from another model would also
+    # make it unsearchable
+    check_collection_metadata(chroma._collection.metadata, embedding_backend)
 
     # Initialize text splitter
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=overlap)
 
-    # Iterate over files in the folder
-    for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)
-
-        try:
-            # Load document based on file extension
-            if filename.endswith(".pdf"):
-                loader = PyPDFLoader(file_path)
-                documents = loader.load()
-                
-            elif filename.endswith(".docx"):
-                loader = Docx2txtLoader(file_path)
-                documents = loader.load()
-                
-            elif filename.endswith(".json"):
-                # Handle JSON files
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    json_data = json.load(f)
-                
-                # Check if it's the medical symptoms format
-                if (isinstance(json_data, list) and 
-                    len(json_data) > 0 and 
-                    "symptom" in json_data[0] and 
-                    "follow_up_questions" in json_data[0]):
-                    
-                    # Use custom processing for medical symptoms
-                    documents = process_medical_symptoms_json(json_data)
-                    print(f"Processed {len(documents)} medical symptoms from {filename}")
-                else:
-                    # Skip other JSON formats for now
-                    print(f"Skipping JSON file {filename} - not in medical symptoms format")
+    # Chunks waiting to be written, accumulated across files and flushed in BATCH_SIZE batches
+    pending_docs: list[Document] = []
+
+    # Parse files on worker threads while the main thread chunks, embeds and writes batches
+    with ThreadPoolExecutor(max_workers=LOADER_WORKERS) as executor:
+        futures = {
+            executor.submit(_load_one, entry.path): entry.name
+            for entry in os.scandir(folder_path)
+            if entry.is_file()
+        }
+
+        for future in as_completed(futures):
+            filename = futures[future]
+
+            try:
+                filename, documents = future.result()
+                if documents is None:
+                    print(f"Skipping unsupported file type: {filename}")
                     continue
-            else:
-                print(f"Skipping unsupported file type: {filename}")
-                continue
-            
-            # Split documents into chunks (if they're large)
-            all_chunks = []
-            for doc in documents:
-                if len(doc.page_content) > chunk_size:
-                    chunks = text_splitter.split_documents([doc])
-                    all_chunks.extend(chunks)
+
+                # Split documents into chunks and queue them for Chroma. The splitter leaves
+                # documents under chunk_size intact, so it is called once per group of documents.
+                # Documents flagged with _skip_split bypass the splitter; the flag is dropped
+                # before they reach Chroma.
+                chunk_count = 0
+                for group in _batched(documents, BATCH_SIZE):
+                    to_split = []
+                    chunks = []
+                    for doc in group:
+                        if doc.metadata.pop("_skip_split", False):
+                            chunks.append(doc)
+                        else:
+                            to_split.append(doc)
+                    if to_split:
+                        chunks.extend(text_splitter.split_documents(to_split))
+                    pending_docs.extend(chunks)
+                    chunk_count += len(chunks)
+
+                    # Keep the buffer bounded while streaming large files
+                    if len(pending_docs) >= MAX_PENDING_DOCS:
+                        _flush_documents(chroma, embeddings, pending_docs)
+                        pending_docs.clear()
+
+                if chunk_count:
+                    print(f"Queued {chunk_count} chunks from {filename}")
                 else:
-                    all_chunks.append(doc)
-            
-            # Add chunks to Chroma vector store
-            if all_chunks:
-                chunk_ids = chroma.add_documents(all_chunks)
-                print(f"Added {len(all_chunks)} chunks from {filename}")
-            else:
-                print(f"No content found in {filename}")
-                
-        except Exception as e:
-            print(f"Error processing {filename}: {str(e)}")
-            continue
+                    print(f"No content found in {filename}")
+
+                # Flush all full batches at once so their embedding requests overlap
+                if len(pending_docs) >= BATCH_SIZE:
+                    ready = len(pending_docs) - len(pending_docs) % BATCH_SIZE
+                    _flush_documents(chroma, embeddings, pending_docs[:ready])
+                    del pending_docs[:ready]
+
+            except Exception as e:
+                print(f"Error processing {filename}: {str(e)}")
+                continue
+
+    # Flush whatever is left over after the last full batch
+    if pending_docs:
+        _flush_documents(chroma, embeddings, pending_docs)
+        pending_docs.clear()
 
     print(f"Vector database created and saved in {db_name}.")
     return chroma
@@ -143,29 +232,35 @@ def query_medical_symptoms(chroma_db, query: str, k: int = 3):
     Query the database for medical symptoms and return formatted results.
     """
     retriever = chroma_db.as_retriever(search_kwargs={"k": k})
-    similar_docs = retriever.invoke(query)
-    
-    results = []
-    for i, doc in enumerate(similar_docs, start=1):
-        result = {
+    return [
+        {
             "rank": i,
             "symptom": doc.metadata.get("symptom", "Unknown"),
             "content": doc.page_content,
             "source": doc.metadata.get("source", "Unknown"),
-            "categories": doc.metadata.get("categories", []),
-            "relevance_score": getattr(doc, 'relevance_score', None)
+            "categories": doc.metadata.get("categories", ""),
         }
-        results.append(result)
-    
-    return results
+        for i, doc in enumerate(retriever.invoke(query), start=1)
+    ]
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or update the Chroma vector database")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Delete the existing database and re-embed every document")
+    parser.add_argument("--embeddings", choices=["openai", "huggingface"], default="openai",
+                        help="Embedding backend; switching backends requires --rebuild")
+    args = parser.parse_args()
+
     # Path to the folder containing the documents (including your JSON file)
     folder_path = "./data"  # Make sure your Datasetab94d2b.json is in this folder
 
     # Create the Chroma database
-    chroma = create_chroma_db(folder_path=folder_path)
+    chroma = create_chroma_db(
+        folder_path=folder_path,
+        delete_chroma_db=args.rebuild,
+        embedding_backend=args.embeddings,
+    )
 
     # Test medical symptom queries
     test_queries = [
@@ -188,6 +283,6 @@ if __name__ == "__main__":
         
         for result in results:
             print(f"\n📋 Rank {result['rank']}: {result['symptom']}")
-            print(f"📂 Categories: {', '.join(result['categories'])}")
+            print(f"📂 Categories: {result['categories'].replace(',', ', ')}")
             print(f"📄 Content preview: {result['content'][:200]}...")
             print()
\ No newline at end of file
@@ -5,21 +5,59 @@ This script provides functions to inspect, query, and manage the database.
 """
 
 import sqlite3
-import json
+import orjson
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Any
 from pathlib import Path
 
 
+# Applied to every connection. These settings last only as long as the connection, so
+# inspecting or backing up the database never changes the file: relaxed syncing for the
+# cleanup writes, temp tables in memory and a memory-mapped read path. The journal mode,
+# tables and indexes are set up by memory.initialize_medical_database.
+CONNECTION_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+"""
+
+
+@lru_cache(maxsize=10_000)
+def _parse_symptoms(symptoms_blob: str | None) -> tuple[str, ...]:
+    """Decode a symptoms_reported JSON blob; cached since the same blob repeats across rows."""
+    return tuple(orjson.loads(symptoms_blob)) if symptoms_blob else ()
+
+
+@lru_cache(maxsize=1024)
+def _format_symptoms(symptoms_blob: str | None) -> str:
+    """Render a symptoms_reported JSON blob for CSV; cached since joins repeat each blob."""
+    return '; '.join(_parse_symptoms(symptoms_blob))
+
+
 class MedicalDatabaseManager:
     """Manager class for medical consultation database operations."""
     
     def __init__(self, db_path: str = "./medical_consultations.db"):
         self.db_path = db_path
+        self._conn = None
+    
+    def _open(self):
+        """Open the shared connection and apply the connection PRAGMAs once."""
+        self._conn = sqlite3.connect(self.db_path, cached_statements=256)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(CONNECTION_PRAGMAS)
+        return self._conn
     
     def get_connection(self):
-        """Get a database connection."""
-        return sqlite3.connect(self.db_path)
+        """Get the shared database connection, opening it on first use."""
+        return self._conn or self._open()
+    
+    def close(self):
+        """Close the shared database connection if it is open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
     
     def verify_database_exists(self) -> bool:
         """Check if the database file exists."""
@@ -40,7 +78,6 @@ class MedicalDatabaseManager:
             columns = [row[1] for row in cursor.fetchall()]
             table_info[table] = columns
         
-        conn.close()
         return table_info
     
     def get_consultation_count(self) -> int:
@@ -51,7 +88,6 @@ class MedicalDatabaseManager:
         cursor.execute("SELECT COUNT(*) FROM patient_consultations;")
         count = cursor.fetchone()[0]
         
-        conn.close()
         return count
     
     def get_completed_consultations(self) -> List[Dict[str, Any]]:
@@ -69,17 +105,16 @@ class MedicalDatabaseManager:
         """)
         
         results = cursor.fetchall()
-        conn.close()
         
         consultations = []
         for row in results:
             consultation = {
-                "session_id": row[0],
-                "patient_name": row[1],
-                "patient_email": row[2],
-                "start_time": row[3],
-                "end_time": row[4],
-                "symptoms": json.loads(row[5]) if row[5] else []
+                "session_id": row["session_id"],
+                "patient_name": row["patient_name"],
+                "patient_email": row["patient_email"],
+                "start_time": row["consultation_start_time"],
+                "end_time": row["consultation_end_time"],
+                "symptoms": list(_parse_symptoms(row["symptoms_reported"]))
             }
             consultations.append(consultation)
         
@@ -97,14 +132,9 @@ class MedicalDatabaseManager:
         
         consultation_row = cursor.fetchone()
         if not consultation_row:
-            conn.close()
             return {}
         
-        # Get column names
-        cursor.execute("PRAGMA table_info(patient_consultations);")
-        columns = [row[1] for row in cursor.fetchall()]
-        
-        consultation = dict(zip(columns, consultation_row))
+        consultation = dict(consultation_row)
         
         # Get responses
         cursor.execute("""
@@ -112,7 +142,7 @@ class MedicalDatabaseManager:
                    symptom_name, response_timestamp
             FROM patient_responses 
             WHERE session_id = ?
-            ORDER BY response_timestamp;
+            ORDER BY response_timestamp, id;
         """, (session_id,))
         
         responses = []
@@ -139,13 +169,12 @@ class MedicalDatabaseManager:
         if summary_row:
             consultation["summary"] = {
                 "text": summary_row[0],
-                "key_findings": json.loads(summary_row[1]) if summary_row[1] else [],
-                "red_flags": json.loads(summary_row[2]) if summary_row[2] else [],
-                "recommendations": json.loads(summary_row[3]) if summary_row[3] else [],
-                "next_steps": json.loads(summary_row[4]) if summary_row[4] else []
+                "key_findings": orjson.loads(summary_row[1]) if summary_row[1] else [],
+                "red_flags": orjson.loads(summary_row[2]) if summary_row[2] else [],
+                "recommendations": orjson.loads(summary_row[3]) if summary_row[3] else [],
+                "next_steps": orjson.loads(summary_row[4]) if summary_row[4] else []
             }
         
-        conn.close()
         return consultation
     
     def export_consultation_csv(self, output_file: str = "consultations_export.csv"):
@@ -155,19 +184,6 @@ class MedicalDatabaseManager:
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT pc.session_id, pc.patient_name, pc.patient_email,
-                   pc.consultation_start_time, pc.consultation_end_time,
-                   pc.symptoms_reported, pc.completed,
-                   pr.question_text, pr.response_text, pr.question_category
-            FROM patient_consultations pc
-            LEFT JOIN patient_responses pr ON pc.session_id = pr.session_id
-            ORDER BY pc.consultation_start_time, pr.response_timestamp;
-        """)
-        
-        results = cursor.fetchall()
-        conn.close()
-        
         with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow([
@@ -176,14 +192,22 @@ class MedicalDatabaseManager:
                 'Question', 'Response', 'Category'
             ])
             
-            for row in results:
-                symptoms = json.loads(row[5]) if row[5] else []
-                symptoms_str = '; '.join(symptoms)
-                
-                writer.writerow([
+            cursor.execute("""
+                SELECT pc.session_id, pc.patient_name, pc.patient_email,
+                       pc.consultation_start_time, pc.consultation_end_time,
+                       pc.symptoms_reported, pc.completed,
+                       pr.question_text, pr.response_text, pr.question_category
+                FROM patient_consultations pc
+                LEFT JOIN patient_responses pr ON pc.session_id = pr.session_id
+                ORDER BY pc.consultation_start_time, pr.response_timestamp, pr.id;
+            """)
+            
+            # Rows are written as the cursor yields them so the join is never held in memory
+            for row in cursor:
+                writer.writerow((
                     row[0], row[1], row[2], row[3], row[4],
-                    symptoms_str, row[6], row[7], row[8], row[9]
-                ])
+                    _format_symptoms(row[5]), row[6], row[7], row[8], row[9]
+                ))
         
         print(f"Data exported to {output_file}")
     
@@ -194,17 +218,20 @@ class MedicalDatabaseManager:
         
         stats = {}
         
-        # Total consultations
-        cursor.execute("SELECT COUNT(*) FROM patient_consultations;")
-        stats['total_consultations'] = cursor.fetchone()[0]
-        
-        # Completed consultations
-        cursor.execute("SELECT COUNT(*) FROM patient_consultations WHERE completed = 1;")
-        stats['completed_consultations'] = cursor.fetchone()[0]
-        
-        # In-progress consultations
-        cursor.execute("SELECT COUNT(*) FROM patient_consultations WHERE completed = 0;")
-        stats['in_progress_consultations'] = cursor.fetchone()[0]
+        # Consultation counts in a single scan of patient_consultations
+        cursor.execute("""
+            SELECT COUNT(*),
+                   COALESCE(SUM(completed = 1), 0),
+                   COALESCE(SUM(completed = 0), 0),
+                   COALESCE(SUM(consultation_start_time >= datetime('now', '-7 days')), 0)
+            FROM patient_consultations;
+        """)
+        (
+            stats['total_consultations'],
+            stats['completed_consultations'],
+            stats['in_progress_consultations'],
+            stats['consultations_last_7_days'],
+        ) = cursor.fetchone()
         
         # Total responses
         cursor.execute("SELECT COUNT(*) FROM patient_responses;")
@@ -218,66 +245,46 @@ class MedicalDatabaseManager:
         """)
         stats['consultations_by_stage'] = dict(cursor.fetchall())
         
-        # Most common symptoms
+        # Most common symptoms, counted individually by expanding each JSON array in SQL
         cursor.execute("""
-            SELECT symptoms_reported, COUNT(*) as count
-            FROM patient_consultations 
-            WHERE symptoms_reported IS NOT NULL AND symptoms_reported != '[]'
-            GROUP BY symptoms_reported
+            SELECT symptom.value AS symptom, COUNT(*) as count
+            FROM patient_consultations, json_each(symptoms_reported) AS symptom
+            WHERE symptoms_reported IS NOT NULL AND json_valid(symptoms_reported)
+            GROUP BY symptom.value
             ORDER BY count DESC
             LIMIT 10;
         """)
         
-        common_symptoms = []
-        for row in cursor.fetchall():
-            try:
-                symptoms = json.loads(row[0])
-                common_symptoms.append({
-                    'symptoms': symptoms,
-                    'count': row[1]
-                })
-            except json.JSONDecodeError:
-                continue
+        common_symptoms = [{'symptom': row[0], 'count': row[1]} for row in cursor.fetchall()]
         
         stats['common_symptoms'] = common_symptoms
         
-        # Recent activity (last 7 days)
-        cursor.execute("""
-            SELECT COUNT(*) 
-            FROM patient_consultations 
-            WHERE consultation_start_time >= datetime('now', '-7 days');
-        """)
-        stats['consultations_last_7_days'] = cursor.fetchone()[0]
-        
-        conn.close()
         return stats
     
     def cleanup_incomplete_consultations(self, older_than_hours: int = 24):
         """Clean up incomplete consultations older than specified hours."""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Delete old incomplete consultations
-        cursor.execute("""
-            DELETE FROM patient_consultations 
-            WHERE completed = 0 
-            AND consultation_start_time < datetime('now', '-{} hours');
-        """.format(older_than_hours))
-        
-        deleted_consultations = cursor.rowcount
-        
-        # Clean up orphaned responses
-        cursor.execute("""
-            DELETE FROM patient_responses 
-            WHERE session_id NOT IN (
-                SELECT session_id FROM patient_consultations
-            );
-        """)
-        
-        deleted_responses = cursor.rowcount
         
-        conn.commit()
-        conn.close()
+        # Both deletes run in a single transaction, rolled back if either fails
+        with conn:
+            # Delete old incomplete consultations
+            cursor = conn.execute("""
+                DELETE FROM patient_consultations 
+                WHERE completed = 0 
+                AND consultation_start_time < datetime('now', '-{} hours');
+            """.format(older_than_hours))
+            
+            deleted_consultations = cursor.rowcount
+            
+            # Clean up orphaned responses
+            cursor = conn.execute("""
+                DELETE FROM patient_responses 
+                WHERE session_id NOT IN (
+                    SELECT session_id FROM patient_consultations
+                );
+            """)
+            
+            deleted_responses = cursor.rowcount
         
         return {
             'deleted_consultations': deleted_consultations,
@@ -290,8 +297,13 @@ class MedicalDatabaseManager:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_path = f"medical_consultations_backup_{timestamp}.db"
         
-        import shutil
-        shutil.copy2(self.db_path, backup_path)
+        # The online backup API copies a consistent snapshot (including WAL contents) page by
+        # page, so it is safe while other connections are writing.
+        dst = sqlite3.connect(backup_path)
+        try:
+            self.get_connection().backup(dst, pages=1024)
+        finally:
+            dst.close()
         print(f"Database backed up to {backup_path}")
         return backup_path
 
@@ -346,84 +358,86 @@ def main():
         print("Run the setup_medical_system.py script first to create the database.")
         return
     
-    if args.command == "info":
-        print(f"Database: {args.db_path}")
-        print(f"Database exists: {db_manager.verify_database_exists()}")
-        print("\nTable Information:")
-        table_info = db_manager.get_table_info()
-        for table, columns in table_info.items():
-            print(f"  {table}: {', '.join(columns)}")
-    
-    elif args.command == "stats":
-        stats = db_manager.get_database_statistics()
-        print("Database Statistics:")
-        print(f"  Total consultations: {stats['total_consultations']}")
-        print(f"  Completed consultations: {stats['completed_consultations']}")
-        print(f"  In-progress consultations: {stats['in_progress_consultations']}")
-        print(f"  Total responses: {stats['total_responses']}")
-        print(f"  Consultations in last 7 days: {stats['consultations_last_7_days']}")
-        
-        print("\nConsultations by stage:")
-        for stage, count in stats['consultations_by_stage'].items():
-            print(f"  {stage}: {count}")
-        
-        if stats['common_symptoms']:
-            print("\nMost common symptom combinations:")
-            for i, symptom_data in enumerate(stats['common_symptoms'][:5], 1):
-                symptoms_str = ', '.join(symptom_data['symptoms'])
-                print(f"  {i}. {symptoms_str} (count: {symptom_data['count']})")
-    
-    elif args.command == "export":
-        db_manager.export_consultation_csv(args.output)
-    
-    elif args.command == "details":
-        details = db_manager.get_consultation_details(args.session_id)
-        if not details:
-            print(f"No consultation found with session ID: {args.session_id}")
-            return
-        
-        print(f"Consultation Details for {args.session_id}:")
-        print(f"  Patient: {details.get('patient_name', 'N/A')}")
-        print(f"  Email: {details.get('patient_email', 'N/A')}")
-        print(f"  Stage: {details.get('consultation_stage', 'N/A')}")
-        print(f"  Started: {details.get('consultation_start_time', 'N/A')}")
-        print(f"  Completed: {details.get('completed', False)}")
-        
-        symptoms = json.loads(details.get('symptoms_reported', '[]'))
-        if symptoms:
-            print(f"  Symptoms: {', '.join(symptoms)}")
-        
-        print(f"\nResponses ({len(details.get('responses', []))}):")
-        for resp in details.get('responses', []):
-            print(f"  Q: {resp['question']}")
-            print(f"  A: {resp['response']}")
-            print(f"  Category: {resp['category']}")
-            print()
-    
-    elif args.command == "cleanup":
-        result = db_manager.cleanup_incomplete_consultations(args.hours)
-        print(f"Cleaned up {result['deleted_consultations']} incomplete consultations")
-        print(f"Cleaned up {result['deleted_responses']} orphaned responses")
-    
-    elif args.command == "backup":
-        backup_path = db_manager.backup_database(args.output)
-        print(f"Database backed up to: {backup_path}")
-    
-    elif args.command == "list":
-        consultations = db_manager.get_completed_consultations()
-        if not consultations:
-            print("No completed consultations found.")
-            return
-        
-        print(f"Completed Consultations ({len(consultations)}):")
-        print("-" * 80)
-        for consultation in consultations:
-            print(f"Session ID: {consultation['session_id']}")
-            print(f"Patient: {consultation['patient_name']}")
-            print(f"Started: {consultation['start_time']}")
-            symptoms_str = ', '.join(consultation['symptoms'])
-            print(f"Symptoms: {symptoms_str}")
-            print("-" * 40)
+    try:
+        if args.command == "info":
+            print(f"Database: {args.db_path}")
+            print(f"Database exists: {db_manager.verify_database_exists()}")
+            print("\nTable Information:")
+            table_info = db_manager.get_table_info()
+            for table, columns in table_info.items():
+                print(f"  {table}: {', '.join(columns)}")
+    
+        elif args.command == "stats":
+            stats = db_manager.get_database_statistics()
+            print("Database Statistics:")
+            print(f"  Total consultations: {stats['total_consultations']}")
+            print(f"  Completed consultations: {stats['completed_consultations']}")
+            print(f"  In-progress consultations: {stats['in_progress_consultations']}")
+            print(f"  Total responses: {stats['total_responses']}")
+            print(f"  Consultations in last 7 days: {stats['consultations_last_7_days']}")
+        
+            print("\nConsultations by stage:")
+            for stage, count in stats['consultations_by_stage'].items():
+                print(f"  {stage}: {count}")
+        
+            if stats['common_symptoms']:
+                print("\nMost common symptoms:")
+                for i, symptom_data in enumerate(stats['common_symptoms'][:5], 1):
+                    print(f"  {i}. {symptom_data['symptom']} (count: {symptom_data['count']})")
+    
+        elif args.command == "export":
+            db_manager.export_consultation_csv(args.output)
+    
+        elif args.command == "details":
+            details = db_manager.get_consultation_details(args.session_id)
+            if not details:
+                print(f"No consultation found with session ID: {args.session_id}")
+                return
+        
+            print(f"Consultation Details for {args.session_id}:")
+            print(f"  Patient: {details.get('patient_name', 'N/A')}")
+            print(f"  Email: {details.get('patient_email', 'N/A')}")
+            print(f"  Stage: {details.get('consultation_stage', 'N/A')}")
+            print(f"  Started: {details.get('consultation_start_time', 'N/A')}")
+            print(f"  Completed: {details.get('completed', False)}")
+        
+            symptoms = _parse_symptoms(details.get('symptoms_reported'))
+            if symptoms:
+                print(f"  Symptoms: {', '.join(symptoms)}")
+        
+            print(f"\nResponses ({len(details.get('responses', []))}):")
+            for resp in details.get('responses', []):
+                print(f"  Q: {resp['question']}")
+                print(f"  A: {resp['response']}")
+                print(f"  Category: {resp['category']}")
+                print()
+    
+        elif args.command == "cleanup":
+            result = db_manager.cleanup_incomplete_consultations(args.hours)
+            print(f"Cleaned up {result['deleted_consultations']} incomplete consultations")
+            print(f"Cleaned up {result['deleted_responses']} orphaned responses")
+    
+        elif args.command == "backup":
+            backup_path = db_manager.backup_database(args.output)
+            print(f"Database backed up to: {backup_path}")
+    
+        elif args.command == "list":
+            consultations = db_manager.get_completed_consultations()
+            if not consultations:
+                print("No completed consultations found.")
+                return
+        
+            print(f"Completed Consultations ({len(consultations)}):")
+            print("-" * 80)
+            for consultation in consultations:
+                print(f"Session ID: {consultation['session_id']}")
+                print(f"Patient: {consultation['patient_name']}")
+                print(f"Started: {consultation['start_time']}")
+                symptoms_str = ', '.join(consultation['symptoms'])
+                print(f"Symptoms: {symptoms_str}")
+                print("-" * 40)
+    finally:
+        db_manager.close()
 
 
 if __name__ == "__main__":
@@ -4,23 +4,69 @@ Complete integration script for the Medical Doctor Assistant Agent system.
 This script sets up both the RAG database and the patient consultation system.
 """
 
+import argparse
+import asyncio
 import os
-import json
 import sqlite3
-import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Set, Tuple
 
+import chromadb
+from chromadb.errors import NotFoundError
+import ijson
 from dotenv import load_dotenv
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 from langchain_community.document_loaders import Docx2txtLoader, PyPDFLoader
 from langchain_openai import OpenAIEmbeddings
 from langchain.schema import Document
 
+# The consultation database schema and the Chroma collection settings, chunk ids and symptom
+# documents are defined once, in the service's memory package; scripts/create_chroma_db.py
+# writes the same collection
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from memory.knowledge_base import (
+    COLLECTION_NAME,
+    check_collection_metadata,
+    chunk_id,
+    collection_metadata,
+    symptom_document,
+)
+from memory.medical_schema import CONSULTATION_SCHEMA, CONSULTATION_TABLES
+
 # Load environment variables
 load_dotenv()
 
+# Number of chunks per Chroma write; chunks are buffered across files and flushed in batches
+BATCH_SIZE = 200
+# Concurrent embedding requests per flush; the buffer holds this many batches before writing
+EMBED_WORKERS = 8
+# On-disk cache of document embeddings, reused across rebuilds
+EMBEDDING_CACHE_DIR = "./.embed_cache"
+# Maximum groups buffered between ingest pipeline stages before the producer waits
+PIPELINE_QUEUE_SIZE = 4
+
+
+_SYMPTOM_KEYS = frozenset({"symptom", "follow_up_questions"})
+
+
+def _is_symptom_schema(item: Any) -> bool:
+    """Check whether a JSON array item is a medical symptom entry."""
+    return isinstance(item, dict) and item.keys() >= _SYMPTOM_KEYS
+
+
+def _load_file(file_path: str) -> List[Document]:
+    """Load a PDF or DOCX file; module-level so it can run in a worker process."""
+    if file_path.endswith(".pdf"):
+        return PyPDFLoader(file_path).load()
+    return Docx2txtLoader(file_path).load()
+
 
 class MedicalSystemIntegration:
     """Complete medical system integration class."""
@@ -37,202 +83,212 @@ class MedicalSystemIntegration:
         
     def setup_sqlite_database(self):
         """Set up SQLite database for patient consultations."""
-        conn = sqlite3.connect(self.sqlite_db)
-        cursor = conn.cursor()
-        
-        # Create tables for patient consultation data
-        tables = {
-            "patient_consultations": """
-                CREATE TABLE IF NOT EXISTS patient_consultations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT UNIQUE NOT NULL,
-                    user_id TEXT,
-                    patient_name TEXT,
-                    patient_email TEXT,
-                    consultation_stage TEXT NOT NULL,
-                    symptoms_reported TEXT,
-                    current_symptom_index INTEGER DEFAULT 0,
-                    current_question_index INTEGER DEFAULT 0,
-                    consultation_start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    consultation_end_time TIMESTAMP,
-                    completed BOOLEAN DEFAULT FALSE,
-                    summary_generated BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """,
-            
-            "patient_responses": """
-                CREATE TABLE IF NOT EXISTS patient_responses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    question_id TEXT NOT NULL,
-                    question_text TEXT NOT NULL,
-                    question_category TEXT NOT NULL,
-                    response_text TEXT NOT NULL,
-                    symptom_name TEXT,
-                    response_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    follow_up_needed BOOLEAN DEFAULT FALSE,
-                    FOREIGN KEY (session_id) REFERENCES patient_consultations (session_id)
-                );
-            """,
+        # Closing the connection also rolls back a schema script that failed partway
+        with closing(sqlite3.connect(self.sqlite_db)) as conn:
+            # WAL is stored in the database file, so the consultation agent's connections use it too
+            conn.execute("PRAGMA journal_mode=WAL")
             
-            "consultation_summaries": """
-                CREATE TABLE IF NOT EXISTS consultation_summaries (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT UNIQUE NOT NULL,
-                    summary_text TEXT NOT NULL,
-                    key_findings TEXT,
-                    red_flags TEXT,
-                    recommendations TEXT,
-                    next_steps TEXT,
-                    generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (session_id) REFERENCES patient_consultations (session_id)
-                );
-            """
-        }
-        
-        for table_name, table_sql in tables.items():
-            cursor.execute(table_sql)
-            print(f"Created/verified table: {table_name}")
+            # Tables and indexes come from the schema shared with the consultation agent
+            conn.executescript(f"BEGIN;{CONSULTATION_SCHEMA}COMMIT;")
+            for table_name in CONSULTATION_TABLES:
+                print(f"Created/verified table: {table_name}")
         
-        conn.commit()
-        conn.close()
         print(f"SQLite database setup complete: {self.sqlite_db}")
         
-    def process_medical_symptoms_json(self, json_data: List[Dict]) -> List[Document]:
+    def process_medical_symptoms_json(self, json_data: Iterable[Dict]) -> List[Document]:
         """Process medical symptoms JSON into documents."""
-        documents = []
+        return [symptom_document(item) for item in json_data]
+    
+    def _stream_medical_symptoms(self, file_path: Path) -> Iterator[Document]:
+        """Stream symptom documents from a JSON array without loading the whole file."""
+        with open(file_path, 'rb') as f:
+            items = ijson.items(f, "item")
+            first = next(items, None)
+            if not _is_symptom_schema(first):
+                print(f"Skipping JSON file {file_path.name} - not in medical symptoms format")
+                return
+            
+            yield symptom_document(first)
+            for item in items:
+                yield symptom_document(item)
+    
+    def _add_documents(self, collection, embeddings, chunks: List[Tuple[str, Document]]):
+        """
+        Embed (id, document) pairs in BATCH_SIZE batches on EMBED_WORKERS threads, then write the
+        precomputed vectors to the collection so Chroma does not embed them serially.
+        Ids are content hashes, so re-ingesting an unchanged chunk does not duplicate it.
+        """
+        batches = [chunks[i:i + BATCH_SIZE] for i in range(0, len(chunks), BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=EMBED_WORKERS) as executor:
+            vectors = executor.map(
+                embeddings.embed_documents,
+                [[doc.page_content for _, doc in batch] for batch in batches],
+            )
+            for batch, batch_vectors in zip(batches, vectors):
+                collection.add(
+                    ids=[doc_id for doc_id, _ in batch],
+                    documents=[doc.page_content for _, doc in batch],
+                    metadatas=[doc.metadata for _, doc in batch],
+                    embeddings=batch_vectors,
+                )
+    
+    async def _ingest_files(self, collection, embeddings, text_splitter) -> Tuple[int, int]:
+        """
+        Load, split and write every file in the data folder as a three-stage pipeline.
+        Bounded queues connect the stages, so PDF parsing, splitting and embedding overlap
+        instead of running one after another. Returns (chunks queued, duplicates skipped).
+        """
+        loop = asyncio.get_running_loop()
+        # (filename, documents) groups from the loader; documents=None marks the end of a file
+        doc_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        # Lists of (id, chunk) pairs from the splitter
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        total_documents = 0
+        duplicate_chunks = 0
         
-        for item in json_data:
-            symptom = item.get("symptom", "")
-            follow_up_questions = item.get("follow_up_questions", {})
+        async def load():
+            # PDFs and DOCX files are parsed in worker processes; JSON is streamed in groups on a thread
+            file_paths = [path for path in self.data_folder.glob("*") if path.is_file()]
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                loads = {
+                    path: loop.run_in_executor(executor, _load_file, str(path))
+                    for path in file_paths
+                    if path.suffix in (".pdf", ".docx")
+                }
+                
+                for file_path in file_paths:
+                    filename = file_path.name
+                    print(f"Processing: {filename}")
+                    
+                    try:
+                        if file_path in loads:
+                            await doc_queue.put((filename, await loads[file_path]))
+                            
+                        elif filename.endswith(".json"):
+                            stream = self._stream_medical_symptoms(file_path)
+                            while group := await asyncio.to_thread(list, islice(stream, BATCH_SIZE)):
+                                await doc_queue.put((filename, group))
+                        else:
+                            print(f"Skipping unsupported file type: {filename}")
+                            continue
+                        
+                    except Exception as e:
+                        print(f"Error processing {filename}: {e}")
+                    
+                    await doc_queue.put((filename, None))
             
-            # Create comprehensive content
-            content_parts = [f"Medical Symptom: {symptom}"]
-            content_parts.append("=" * 60)
+            await doc_queue.put(None)
+        
+        async def split():
+            nonlocal total_documents, duplicate_chunks
+            # Content hashes already queued; identical chunks are embedded and stored only once
+            seen_ids: Set[str] = set()
+            chunk_count = 0
             
-            # Add structured questions by category
-            for category, questions in follow_up_questions.items():
-                category_title = category.replace("_", " ").title()
-                content_parts.append(f"\n{category_title} Questions:")
-                content_parts.append("-" * 40)
+            while (item := await doc_queue.get()) is not None:
+                filename, documents = item
+                if documents is None:
+                    if chunk_count:
+                        total_documents += chunk_count
+                        print(f"Queued {chunk_count} chunks from {filename}")
+                    chunk_count = 0
+                    continue
+                
+                # The splitter returns short documents unchanged
+                chunks = []
+                try:
+                    for chunk in text_splitter.split_documents(documents):
+                        chunk_key = chunk_id(chunk)
+                        if chunk_key in seen_ids:
+                            duplicate_chunks += 1
+                            continue
+                        seen_ids.add(chunk_key)
+                        chunks.append((chunk_key, chunk))
+                except Exception as e:
+                    print(f"Error processing {filename}: {e}")
+                    continue
                 
-                for i, question in enumerate(questions, 1):
-                    content_parts.append(f"{i}. {question}")
-                content_parts.append("")
+                chunk_count += len(chunks)
+                await chunk_queue.put(chunks)
             
-            # Add searchable keywords
-            content_parts.append("\nSearchable Keywords:")
-            keywords = [symptom.lower()]
-            for category in follow_up_questions.keys():
-                keywords.append(category.replace("_", " "))
-            content_parts.append(", ".join(keywords))
+            await chunk_queue.put(None)
+        
+        async def write():
+            # (id, chunk) pairs waiting to be written, accumulated across files and flushed in BATCH_SIZE batches
+            pending: List[Tuple[str, Document]] = []
             
-            full_content = "\n".join(content_parts)
+            while (chunks := await chunk_queue.get()) is not None:
+                pending.extend(chunks)
+                
+                # Write all full batches together once enough are queued to embed them in parallel
+                if len(pending) >= BATCH_SIZE * EMBED_WORKERS:
+                    ready = len(pending) - len(pending) % BATCH_SIZE
+                    await asyncio.to_thread(self._add_documents, collection, embeddings, pending[:ready])
+                    del pending[:ready]
             
-            # Create document with rich metadata
-            doc = Document(
-                page_content=full_content,
-                metadata={
-                    "symptom": symptom,
-                    "source": "medical_symptoms_database",
-                    "type": "medical_symptom",
-                    "categories": list(follow_up_questions.keys()),
-                    "total_questions": sum(len(q) for q in follow_up_questions.values()),
-                    "search_keywords": keywords
-                }
-            )
-            documents.append(doc)
+            # Flush the remainder after the last full batch
+            if pending:
+                await asyncio.to_thread(self._add_documents, collection, embeddings, pending)
+        
+        async with asyncio.TaskGroup() as tasks:
+            tasks.create_task(load())
+            tasks.create_task(split())
+            tasks.create_task(write())
         
-        return documents
+        return total_documents, duplicate_chunks
     
-    def create_chroma_database(self, chunk_size: int = 2000, overlap: int = 500, delete_existing: bool = True):
+    def create_chroma_database(self, chunk_size: int = 512, overlap: int = 50, delete_existing: bool = True):
         """Create ChromaDB with medical symptoms and other documents."""
         
         try:
-            embeddings = OpenAIEmbeddings(api_key=os.environ["OPENAI_API_KEY"])
+            underlying = OpenAIEmbeddings(api_key=os.environ["OPENAI_API_KEY"])
         except Exception as e:
             raise RuntimeError(f"Failed to initialize OpenAI embeddings: {e}")
         
-        # Initialize Chroma vector store
-        if delete_existing and os.path.exists(self.db_name):
-            shutil.rmtree(self.db_name)
-            print(f"Deleted existing database at {self.db_name}")
-        
-        chroma = Chroma(
-            embedding_function=embeddings,
-            persist_directory=self.db_name,
+        # Cache document and query embeddings on disk, keyed by model and text, so rebuilding the
+        # database only calls the API for chunks that changed and repeated test queries are free
+        embeddings = CacheBackedEmbeddings.from_bytes_store(
+            underlying,
+            LocalFileStore(EMBEDDING_CACHE_DIR),
+            namespace=underlying.model,
+            query_embedding_cache=True,
         )
         
+        # Write through the native client; the LangChain wrapper is only needed for querying
+        client = chromadb.PersistentClient(path=self.db_name)
+        
+        # Drop only the collection; Chroma deletes its rows and index instead of removing the directory
+        if delete_existing:
+            try:
+                client.delete_collection(COLLECTION_NAME)
+                print(f"Deleted existing collection in {self.db_name}")
+            except NotFoundError:
+                pass
+        
+        # An existing store keeps its own settings; this script always embeds with OpenAI, so it
+        # also can't add to a store built with another backend
+        collection = client.get_or_create_collection(COLLECTION_NAME, metadata=collection_metadata("openai"))
+        check_collection_metadata(collection.metadata, "openai")
+        
         # Initialize text splitter
-        text_splitter = RecursiveCharacterTextSplitter(
+        # Chunk sizes are measured in tokens of the embedding model's encoding
+        text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+            encoding_name="cl100k_base",
             chunk_size=chunk_size, 
             chunk_overlap=overlap
         )
         
-        total_documents = 0
-        
-        # Process all files in data folder
-        for file_path in self.data_folder.glob("*"):
-            if not file_path.is_file():
-                continue
-                
-            filename = file_path.name
-            print(f"Processing: {filename}")
-            
-            try:
-                if filename.endswith(".pdf"):
-                    loader = PyPDFLoader(str(file_path))
-                    documents = loader.load()
-                    
-                elif filename.endswith(".docx"):
-                    loader = Docx2txtLoader(str(file_path))
-                    documents = loader.load()
-                    
-                elif filename.endswith(".json"):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        json_data = json.load(f)
-                    
-                    # Check for medical symptoms format
-                    if (isinstance(json_data, list) and 
-                        len(json_data) > 0 and 
-                        "symptom" in json_data[0] and 
-                        "follow_up_questions" in json_data[0]):
-                        
-                        documents = self.process_medical_symptoms_json(json_data)
-                        print(f"Processed {len(documents)} medical symptoms from {filename}")
-                    else:
-                        print(f"Skipping JSON file {filename} - not in medical symptoms format")
-                        continue
-                else:
-                    print(f"Skipping unsupported file type: {filename}")
-                    continue
-                
-                # Split large documents into chunks
-                all_chunks = []
-                for doc in documents:
-                    if len(doc.page_content) > chunk_size:
-                        chunks = text_splitter.split_documents([doc])
-                        all_chunks.extend(chunks)
-                    else:
-                        all_chunks.append(doc)
-                
-                # Add to ChromaDB
-                if all_chunks:
-                    chunk_ids = chroma.add_documents(all_chunks)
-                    total_documents += len(all_chunks)
-                    print(f"Added {len(all_chunks)} chunks from {filename}")
-                
-            except Exception as e:
-                print(f"Error processing {filename}: {e}")
-                continue
+        total_documents, duplicate_chunks = asyncio.run(
+            self._ingest_files(collection, embeddings, text_splitter)
+        )
         
         print(f"Vector database creation complete!")
         print(f"Total documents added: {total_documents}")
+        if duplicate_chunks:
+            print(f"Duplicate chunks skipped: {duplicate_chunks}")
         print(f"Database location: {self.db_name}")
         
-        return chroma
+        return Chroma(client=client, collection_name=COLLECTION_NAME, embedding_function=embeddings)
     
     def test_medical_queries(self, chroma_db):
         """Test the medical symptom database with sample queries."""
@@ -251,22 +307,29 @@ class MedicalSystemIntegration:
             "fatigue assessment protocol"
         ]
         
-        retriever = chroma_db.as_retriever(search_kwargs={"k": 3})
+        # Run all queries concurrently so their embedding requests overlap, then print in order
+        all_results = asyncio.run(self._search_all(chroma_db, test_queries, k=3))
         
-        for query in test_queries:
+        for query, results in zip(test_queries, all_results):
             print(f"\nQuery: '{query}'")
             print("-" * 40)
             
-            try:
-                results = retriever.invoke(query)
-                for i, doc in enumerate(results, 1):
-                    symptom = doc.metadata.get("symptom", "Unknown")
-                    doc_type = doc.metadata.get("type", "general")
-                    print(f"{i}. {symptom} ({doc_type})")
-                    print(f"   Preview: {doc.page_content[:100]}...")
-                    
-            except Exception as e:
-                print(f"Error querying: {e}")
+            if isinstance(results, Exception):
+                print(f"Error querying: {results}")
+                continue
+            
+            for i, doc in enumerate(results, 1):
+                symptom = doc.metadata.get("symptom", "Unknown")
+                doc_type = doc.metadata.get("type", "general")
+                print(f"{i}. {symptom} ({doc_type})")
+                print(f"   Preview: {doc.page_content[:100]}...")
+    
+    async def _search_all(self, chroma_db, queries: List[str], k: int) -> List[Any]:
+        """Search for every query at once; failed queries return their exception."""
+        return await asyncio.gather(
+            *(chroma_db.asimilarity_search(query, k=k) for query in queries),
+            return_exceptions=True,
+        )
     
     def create_agent_files(self):
         """Create the necessary agent files for integration."""
@@ -298,7 +361,7 @@ __all__ = [
                     f.write(content)
                 print(f"Created: {file_path}")
     
-    def run_complete_setup(self):
+    def run_complete_setup(self, run_tests: bool = True):
         """Run the complete system setup."""
         print("Starting Medical Doctor Assistant Agent Integration")
         print("=" * 60)
@@ -316,8 +379,11 @@ __all__ = [
         chroma_db = self.create_chroma_database()
         
         # Step 4: Test the system
-        print("\n4. Testing medical queries...")
-        self.test_medical_queries(chroma_db)
+        if run_tests:
+            print("\n4. Testing medical queries...")
+            self.test_medical_queries(chroma_db)
+        else:
+            print("\n4. Skipping medical query tests")
         
         # Step 5: Create agent integration files
         print("\n5. Setting up agent integration...")
@@ -346,6 +412,12 @@ __all__ = [
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Set up the medical assistant databases")
+    parser.add_argument("--skip-tests", action=argparse.BooleanOptionalAction, default=None,
+                        help="Skip the sample queries, which make paid embedding calls "
+                             "(default: skip when not run from a terminal)")
+    args = parser.parse_args()
+    skip_tests = args.skip_tests if args.skip_tests is not None else not sys.stdin.isatty()
     
     # Check for required environment variables
     if not os.getenv("OPENAI_API_KEY"):
@@ -357,7 +429,7 @@ def main():
     integration = MedicalSystemIntegration()
     
     try:
-        integration.run_complete_setup()
+        integration.run_complete_setup(run_tests=not skip_tests)
     except Exception as e:
         print(f"Integration failed: {e}")
         print("Please check your configuration and try again.")
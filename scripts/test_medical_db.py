@@ -10,7 +10,7 @@ import sys
 from pathlib import Path
 from src.agents.patient_consultation_agent import MedicalDatabase
 from uuid import uuid4
-import json
+import orjson
 
 
 async def test_database_operations():
@@ -27,12 +27,12 @@ async def test_database_operations():
     session_id = str(uuid4())
     user_id = "test_user_123"
     
-    consultation_data = db.get_or_create_consultation(session_id, user_id)
+    consultation_data = await db.get_or_create_consultation(session_id, user_id)
     print(f"✅ Created consultation: {session_id}")
     print(f"   Initial stage: {consultation_data['consultation_stage']}")
     
     # Test 2: Update patient basic info
-    db.update_consultation(
+    await db.update_consultation(
         session_id,
         patient_name="John Doe",
         patient_email="john.doe@example.com",
@@ -42,9 +42,9 @@ async def test_database_operations():
     
     # Test 3: Add symptoms
     symptoms = ["chest pain", "shortness of breath"]
-    db.update_consultation(
+    await db.update_consultation(
         session_id,
-        symptoms_reported=json.dumps(symptoms),
+        symptoms_reported=orjson.dumps(symptoms).decode(),
         consultation_stage="asking_followup_questions"
     )
     print(f"✅ Added symptoms: {symptoms}")
@@ -74,20 +74,12 @@ async def test_database_operations():
         }
     ]
     
-    for response in responses:
-        db.save_patient_response(
-            session_id=session_id,
-            question_id=response["question_id"],
-            question_text=response["question_text"],
-            category=response["category"],
-            response_text=response["response_text"],
-            symptom_name=response["symptom_name"]
-        )
+    await db.save_patient_responses_bulk(session_id, responses)
     
     print(f"✅ Saved {len(responses)} patient responses")
     
     # Test 5: Retrieve responses
-    saved_responses = db.get_consultation_responses(session_id)
+    saved_responses = await db.get_consultation_responses(session_id)
     print(f"✅ Retrieved {len(saved_responses)} responses from database")
     
     for resp in saved_responses:
@@ -103,7 +95,7 @@ async def test_database_operations():
     Recommend immediate medical evaluation.
     """
     
-    db.save_consultation_summary(
+    await db.save_consultation_summary(
         session_id=session_id,
         summary_text=summary_text.strip(),
         key_findings=["Moderate chest pain", "Concurrent shortness of breath"],
@@ -115,7 +107,7 @@ async def test_database_operations():
     
     # Test 7: Mark consultation as completed
     from datetime import datetime
-    db.update_consultation(
+    await db.update_consultation(
         session_id,
         completed=True,
         consultation_end_time=datetime.now().isoformat(),
@@ -124,7 +116,7 @@ async def test_database_operations():
     print("✅ Marked consultation as completed")
     
     # Test 8: Verify final consultation data
-    final_consultation = db.get_or_create_consultation(session_id, user_id)
+    final_consultation = await db.get_or_create_consultation(session_id, user_id)
     print("\n📋 Final Consultation Data:")
     print(f"   Session ID: {final_consultation['session_id']}")
     print(f"   Patient: {final_consultation['patient_name']}")
@@ -132,7 +124,7 @@ async def test_database_operations():
     print(f"   Stage: {final_consultation['consultation_stage']}")
     print(f"   Completed: {final_consultation['completed']}")
     
-    symptoms_data = json.loads(final_consultation['symptoms_reported'])
+    symptoms_data = orjson.loads(final_consultation['symptoms_reported'])
     print(f"   Symptoms: {symptoms_data}")
     
     print("\n🎉 All database tests passed!")
@@ -141,6 +133,9 @@ async def test_database_operations():
     print("\nTesting Database Manager Utilities:")
     print("-" * 40)
     
+    # The manager reads through its own connection, so commit the queued writes first
+    await db.flush()
+    
     # Import the database manager (you'll need to adjust the path)
     try:
         from database_utils import MedicalDatabaseManager
@@ -160,12 +155,14 @@ async def test_database_operations():
         print(f"   Patient: {details['patient_name']}")
         print(f"   Responses count: {len(details['responses'])}")
         
+        db_manager.close()
         print("\n🎉 Database manager utilities work correctly!")
         
     except ImportError:
         print("⚠️  Database utilities not available (normal if running separately)")
     
     # Cleanup test database
+    await db.aclose()
     test_db_path = Path("./test_medical_consultations.db")
     if test_db_path.exists():
         test_db_path.unlink()
@@ -203,6 +200,7 @@ def test_database_schema():
         print(f"   {table} columns: {', '.join(columns)}")
     
     conn.close()
+    db.close()
     
     # Cleanup
     Path("./test_schema.db").unlink()
@@ -1,4 +1,15 @@
 from agents.agents import DEFAULT_AGENT, AgentGraph, get_agent, get_all_agent_info
-from agents.medical_rag_assistant import medical_rag_assistant
-from agents.patient_consultation_agent import patient_consultation_agent
+
+
+def __getattr__(name: str):
+    # Import these graphs on first access instead of with the package
+    if name in ("medical_rag_assistant", "patient_consultation_agent"):
+        from importlib import import_module
+
+        # Importing the submodule binds its name on this package, so rebind it to the graph
+        graph = globals()[name] = getattr(import_module(f"agents.{name}"), name)
+        return graph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = ["get_agent", "get_all_agent_info", "DEFAULT_AGENT", "AgentGraph","medical_rag_assistant", "patient_consultation_agent"]
@@ -1,19 +1,11 @@
+from collections.abc import Callable
 from dataclasses import dataclass
+from importlib import import_module
 
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.pregel import Pregel
-from agents.medical_rag_assistant import medical_rag_assistant
-from agents.bg_task_agent.bg_task_agent import bg_task_agent
-from agents.chatbot import chatbot
-from agents.command_agent import command_agent
-from agents.interrupt_agent import interrupt_agent
-from agents.knowledge_base_agent import kb_agent
-from agents.langgraph_supervisor_agent import langgraph_supervisor_agent
-from agents.langgraph_supervisor_hierarchy_agent import langgraph_supervisor_hierarchy_agent
-from agents.rag_assistant import rag_assistant
-from agents.research_assistant import research_assistant
 from schema import AgentInfo
-from agents.patient_consultation_agent import patient_consultation_agent
+
 DEFAULT_AGENT = "research-assistant"
 
 # Type alias to handle LangGraph's different agent patterns
@@ -25,7 +17,13 @@ AgentGraph = CompiledStateGraph | Pregel
 @dataclass
 class Agent:
     description: str
-    graph: AgentGraph
+    graph: AgentGraph | None = None
+    # Imports the graph on first use when it is not given up front
+    loader: Callable[[], AgentGraph] | None = None
+
+
+def _lazy(module: str, name: str) -> Callable[[], AgentGraph]:
+    return lambda: getattr(import_module(module), name)
 
 
 # agents: dict[str, Agent] = {
@@ -51,47 +49,66 @@ class Agent:
 #         graph=kb_agent,
 #     ),
 # }
+# Agent modules are imported on first use, so importing the registry doesn't build every graph
 agents: dict[str, Agent] = {
-    "chatbot": Agent(description="A simple chatbot.", graph=chatbot),
+    "chatbot": Agent(description="A simple chatbot.", loader=_lazy("agents.chatbot", "chatbot")),
     "research-assistant": Agent(
-        description="A research assistant with web search and calculator.", graph=research_assistant
+        description="A research assistant with web search and calculator.",
+        loader=_lazy("agents.research_assistant", "research_assistant"),
     ),
     "rag-assistant": Agent(
-        description="A RAG assistant with access to information in a database.", graph=rag_assistant
+        description="A RAG assistant with access to information in a database.",
+        loader=_lazy("agents.rag_assistant", "rag_assistant"),
     ),
     "medical-rag-assistant": Agent(
         description="A specialized medical RAG assistant with access to symptom assessment database and clinical follow-up questions.", 
-        graph=medical_rag_assistant
+        loader=_lazy("agents.medical_rag_assistant", "medical_rag_assistant"),
     ),
     "patient-consultation-agent": Agent(
         description="An interactive patient consultation agent that collects patient information, symptoms, and conducts structured medical interviews using the symptom database.",
-        graph=patient_consultation_agent
+        loader=_lazy("agents.patient_consultation_agent", "patient_consultation_agent"),
+    ),
+    "command-agent": Agent(
+        description="A command agent.", loader=_lazy("agents.command_agent", "command_agent")
+    ),
+    "bg-task-agent": Agent(
+        description="A background task agent.",
+        loader=_lazy("agents.bg_task_agent.bg_task_agent", "bg_task_agent"),
     ),
-    "command-agent": Agent(description="A command agent.", graph=command_agent),
-    "bg-task-agent": Agent(description="A background task agent.", graph=bg_task_agent),
     "langgraph-supervisor-agent": Agent(
-        description="A langgraph supervisor agent", graph=langgraph_supervisor_agent
+        description="A langgraph supervisor agent",
+        loader=_lazy("agents.langgraph_supervisor_agent", "langgraph_supervisor_agent"),
     ),
     "langgraph-supervisor-hierarchy-agent": Agent(
         description="A langgraph supervisor agent with a nested hierarchy of agents",
-        graph=langgraph_supervisor_hierarchy_agent,
+        loader=_lazy(
+            "agents.langgraph_supervisor_hierarchy_agent", "langgraph_supervisor_hierarchy_agent"
+        ),
+    ),
+    "interrupt-agent": Agent(
+        description="An agent the uses interrupts.",
+        loader=_lazy("agents.interrupt_agent", "interrupt_agent"),
     ),
-    "interrupt-agent": Agent(description="An agent the uses interrupts.", graph=interrupt_agent),
     "knowledge-base-agent": Agent(
         description="A retrieval-augmented generation agent using Amazon Bedrock Knowledge Base",
-        graph=kb_agent,
+        loader=_lazy("agents.knowledge_base_agent", "kb_agent"),
     ),
 }
 
 
 def get_agent(agent_id: str) -> AgentGraph:
-    return agents[agent_id].graph
+    agent = agents.get(agent_id)
+    if agent is None:
+        raise KeyError(f"Unknown agent: {agent_id!r}")
+    if agent.graph is None:
+        if agent.loader is None:
+            raise RuntimeError(f"Agent {agent_id!r} has neither a graph nor a loader")
+        # Memoize on the registry entry so later lookups return the same graph instance
+        agent.graph = agent.loader()
+    return agent.graph
 
 
 def get_all_agent_info() -> list[AgentInfo]:
     return [
         AgentInfo(key=agent_id, description=agent.description) for agent_id, agent in agents.items()
     ]
-
-
-
@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import lru_cache
 from typing import Literal
 
 from langchain_core.language_models.chat_models import BaseChatModel
@@ -15,6 +16,7 @@ from langgraph.prebuilt import ToolNode
 from agents.llama_guard import LlamaGuard, LlamaGuardOutput, SafetyAssessment
 from agents.tools import database_search
 from core import get_model, settings
+from schema.models import AllModelEnum
 
 
 class AgentState(MessagesState, total=False):
@@ -65,13 +67,20 @@ instructions = f"""
     """
 
 
+preprocessor = RunnableLambda(
+    lambda state: [SystemMessage(content=instructions)] + state["messages"],
+    name="StateModifier",
+)
+
+
 def wrap_model(model: BaseChatModel) -> RunnableSerializable[AgentState, AIMessage]:
-    bound_model = model.bind_tools(tools)
-    preprocessor = RunnableLambda(
-        lambda state: [SystemMessage(content=instructions)] + state["messages"],
-        name="StateModifier",
-    )
-    return preprocessor | bound_model  # type: ignore[return-value]
+    return preprocessor | model.bind_tools(tools)  # type: ignore[return-value]
+
+
+@lru_cache(maxsize=32)
+def get_model_runnable(model_name: AllModelEnum) -> RunnableSerializable[AgentState, AIMessage]:
+    """Bind the tools once per model instead of on every turn; get_model() caches per name too."""
+    return wrap_model(get_model(model_name))
 
 
 def format_safety_message(safety: LlamaGuardOutput) -> AIMessage:
@@ -82,8 +91,7 @@ def format_safety_message(safety: LlamaGuardOutput) -> AIMessage:
 
 
 async def acall_model(state: AgentState, config: RunnableConfig) -> AgentState:
-    m = get_model(config["configurable"].get("model", settings.DEFAULT_MODEL))
-    model_runnable = wrap_model(m)
+    model_runnable = get_model_runnable(config["configurable"].get("model", settings.DEFAULT_MODEL))
     response = await model_runnable.ainvoke(state, config)
 
     # Run llama guard check here to avoid returning the message if it's unsafe
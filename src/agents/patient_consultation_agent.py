@@ -1,11 +1,19 @@
-import json
+import asyncio
+import logging
 import re
 import sqlite3
-from datetime import datetime
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from typing import Literal, Dict, List, Any
 from enum import Enum
 from uuid import uuid4
 
+import orjson
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
 from langchain_core.runnables import (
@@ -19,8 +27,25 @@ from langgraph.prebuilt import ToolNode
 from langgraph.store.base import BaseStore
 
 from agents.llama_guard import LlamaGuard, LlamaGuardOutput, SafetyAssessment
-from agents.tools import database_search, get_symptom_followup_questions
+from agents.tools import (
+    database_search,
+    get_symptom_followup_questions,
+    get_symptom_followup_questions_batch,
+)
 from core import get_model, settings
+from memory.medical_schema import CONSULTATION_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+# Write-behind queue: writes are committed together, up to this many per transaction...
+WRITE_BATCH_SIZE = 64
+# ...after waiting this long (seconds) for more writes from concurrent turns to arrive
+WRITE_FLUSH_INTERVAL = 0.02
+# Consultation rows kept in memory so resuming a session doesn't re-read its row (least recently used are dropped)
+CONSULTATION_CACHE_SIZE = 10_000
+
+# Basic email validation for the basic info stage
+EMAIL_RE = re.compile(r'^[\w.\-]+@[\w.\-]+\.\w+$')
 
 
 class ConsultationStage(Enum):
@@ -46,213 +71,428 @@ class PatientConsultationState(MessagesState, total=False):
     session_id: str
 
 
-tools = [database_search, get_symptom_followup_questions]
+tools = [database_search, get_symptom_followup_questions, get_symptom_followup_questions_batch]
+
+# Simple predefined questions for each symptom; {s} is the symptom being asked about
+STANDARD_QUESTION_TEMPLATES = (
+    "When did your {s} first start?",
+    "How would you describe your {s} (mild, moderate, severe)?",
+    "Does your {s} get worse with activity or at rest?",
+    "Have you taken any medication for your {s}?",
+    "Do you have any other symptoms that occur along with this one?",
+)
+
+
+# Columns accepted by MedicalDatabase.update_consultation
+UPDATABLE_CONSULTATION_FIELDS = frozenset({
+    "patient_name", "patient_email", "consultation_stage", "symptoms_reported",
+    "current_symptom_index", "current_question_index", "completed", "consultation_end_time",
+})
+CONSULTATION_FIELDS = ("session_id", "user_id", *sorted(UPDATABLE_CONSULTATION_FIELDS))
+
+# Creates or partially updates a consultation in one statement. Parameters left as None get
+# the COALESCE fallback below (or NULL) on insert and keep the stored value on update.
+# Timestamps are supplied by the application as :now, once per write batch (see _write_batch).
+SQL_UPSERT_CONSULTATION = """
+    INSERT INTO patient_consultations (
+        session_id, user_id, patient_name, patient_email, consultation_stage, symptoms_reported,
+        current_symptom_index, current_question_index, completed, consultation_end_time,
+        consultation_start_time, created_at, updated_at
+    ) VALUES (
+        :session_id, :user_id, :patient_name, :patient_email,
+        COALESCE(:consultation_stage, 'greeting'), COALESCE(:symptoms_reported, '[]'),
+        COALESCE(:current_symptom_index, 0), COALESCE(:current_question_index, 0),
+        COALESCE(:completed, FALSE), :consultation_end_time,
+        :now, :now, :now
+    )
+    ON CONFLICT(session_id) DO UPDATE SET
+        user_id = COALESCE(:user_id, user_id),
+        patient_name = COALESCE(:patient_name, patient_name),
+        patient_email = COALESCE(:patient_email, patient_email),
+        consultation_stage = COALESCE(:consultation_stage, consultation_stage),
+        symptoms_reported = COALESCE(:symptoms_reported, symptoms_reported),
+        current_symptom_index = COALESCE(:current_symptom_index, current_symptom_index),
+        current_question_index = COALESCE(:current_question_index, current_question_index),
+        completed = COALESCE(:completed, completed),
+        consultation_end_time = COALESCE(:consultation_end_time, consultation_end_time),
+        updated_at = :now
+"""
+
+# Columns read back when resuming a consultation, in the order SQL_SELECT_CONSULTATION returns them
+CONSULTATION_STATE_FIELDS = (
+    "session_id", "user_id", "patient_name", "patient_email", "consultation_stage",
+    "symptoms_reported", "current_symptom_index", "current_question_index", "completed",
+)
+
+SQL_SELECT_CONSULTATION = f"""
+    SELECT {", ".join(CONSULTATION_STATE_FIELDS)}
+    FROM patient_consultations
+    WHERE session_id = :session_id
+"""
+
+# :response_timestamp is when the patient answered; responses saved without one get :now
+SQL_INSERT_RESPONSE = """
+    INSERT INTO patient_responses 
+    (session_id, question_id, question_text, question_category, 
+     response_text, symptom_name, response_timestamp)
+    VALUES (:session_id, :question_id, :question_text, :category,
+            :response_text, :symptom_name, COALESCE(:response_timestamp, :now))
+"""
+
+SQL_SELECT_RESPONSES = """
+    SELECT question_text AS question, response_text AS response,
+           question_category AS category, symptom_name AS symptom
+    FROM patient_responses 
+    WHERE session_id = :session_id
+    ORDER BY response_timestamp, id
+"""
+
+SQL_SAVE_SUMMARY = """
+    INSERT OR REPLACE INTO consultation_summaries 
+    (session_id, summary_text, key_findings, red_flags, recommendations, next_steps, generated_at)
+    VALUES (:session_id, :summary_text, :key_findings, :red_flags, :recommendations, :next_steps, :now)
+"""
+
+
+def _db_timestamp() -> str:
+    """Current UTC time in the format SQLite's CURRENT_TIMESTAMP uses."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _response_params(session_id: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Parameters for SQL_INSERT_RESPONSE; symptom_name and response_timestamp are optional."""
+    return {"symptom_name": None, "response_timestamp": None, **response, "session_id": session_id}
 
 
 class MedicalDatabase:
     """Helper class to manage SQLite database operations for medical consultations."""
     
-    def __init__(self, db_path: str = "./medical_consultations.db"):
+    def __init__(self, db_path: str = "./medical_consultations.db",
+                 cache_size: int = CONSULTATION_CACHE_SIZE):
         self.db_path = db_path
+        self.cache_size = cache_size
+        # One connection is shared by every call. Queries run on worker threads (asyncio.to_thread)
+        # so they never block the event loop, and access is serialized with a lock; sqlite3 caches
+        # the compiled statements per connection.
+        self._conn = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-20000;
+        """)
+        self._lock = threading.Lock()
+        # Consultation updates and responses are queued and committed in batches by a writer task
+        self._write_queue: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+        # Write-through cache of consultation rows by session_id; SQLite stays the durable copy.
+        # It is only trusted while no other connection (another worker, database_utils cleanup)
+        # has committed to the database, which PRAGMA data_version tells us.
+        self._consultations: OrderedDict[str, Dict[str, Any]] = OrderedDict()
         self.ensure_database_exists()
-    
-    def ensure_database_exists(self):
-        """Ensure the medical consultation database exists with proper tables."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self._data_version = self._read_data_version()
+    
+    @contextmanager
+    def _transaction(self):
+        """Hold the connection lock and run the enclosed statements in one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield self._conn.cursor()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def close(self):
+        """Close the shared connection.
         
-        # Create tables if they don't exist
-        tables = {
-            "patient_consultations": """
-                CREATE TABLE IF NOT EXISTS patient_consultations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT UNIQUE NOT NULL,
-                    user_id TEXT,
-                    patient_name TEXT,
-                    patient_email TEXT,
-                    consultation_stage TEXT NOT NULL,
-                    symptoms_reported TEXT,
-                    current_symptom_index INTEGER DEFAULT 0,
-                    current_question_index INTEGER DEFAULT 0,
-                    consultation_start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    consultation_end_time TIMESTAMP,
-                    completed BOOLEAN DEFAULT FALSE,
-                    summary_generated BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                );
-            """,
-            
-            "patient_responses": """
-                CREATE TABLE IF NOT EXISTS patient_responses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    question_id TEXT NOT NULL,
-                    question_text TEXT NOT NULL,
-                    question_category TEXT NOT NULL,
-                    response_text TEXT NOT NULL,
-                    symptom_name TEXT,
-                    response_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    follow_up_needed BOOLEAN DEFAULT FALSE,
-                    FOREIGN KEY (session_id) REFERENCES patient_consultations (session_id)
-                );
-            """,
-            
-            "consultation_summaries": """
-                CREATE TABLE IF NOT EXISTS consultation_summaries (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT UNIQUE NOT NULL,
-                    summary_text TEXT NOT NULL,
-                    key_findings TEXT,
-                    red_flags TEXT,
-                    recommendations TEXT,
-                    next_steps TEXT,
-                    generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (session_id) REFERENCES patient_consultations (session_id)
-                );
-            """
-        }
+        Writes still queued are committed first, on the calling thread; use aclose() from a
+        coroutine, which also waits for a batch the writer task is committing.
+        """
+        self._stop_writer()
+        self._commit_queued_writes()
+        self._conn.close()
+    
+    async def aclose(self):
+        """Commit every queued write, stop the writer task and close the connection."""
+        await self.flush()
+        writer = self._stop_writer()
+        if writer is not None:
+            with suppress(asyncio.CancelledError):
+                await writer
+        self._conn.close()
+    
+    def _stop_writer(self) -> asyncio.Task | None:
+        """Cancel the writer task, if it is still running, and return it."""
+        writer, self._writer = self._writer, None
+        if writer is not None and not writer.done() and not writer.get_loop().is_closed():
+            writer.cancel()
+        return writer
+    
+    def _commit_queued_writes(self):
+        """Commit, on the calling thread, the writes left in the queue."""
+        if self._write_queue is not None and not self._write_queue.empty():
+            self._commit_batch(self._take_queued_writes(self._write_queue))
+    
+    @staticmethod
+    def _take_queued_writes(queue: asyncio.Queue) -> List[tuple]:
+        batch = []
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+            queue.task_done()
+        return batch
+    
+    def _get_write_queue(self) -> asyncio.Queue:
+        """Return the write queue, starting its writer task on the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._writer is None or self._writer.done() or self._writer.get_loop() is not loop:
+            # A queue from another (e.g. finished) event loop can't be awaited on this one, but
+            # the writes left in it move to the new queue rather than being lost
+            leftover = self._take_queued_writes(self._write_queue) if self._write_queue else []
+            self._write_queue = asyncio.Queue()
+            for write in leftover:
+                self._write_queue.put_nowait(write)
+            self._writer = loop.create_task(self._flush_loop(self._write_queue))
+        return self._write_queue
+    
+    async def _enqueue(self, sql: str, params: Dict[str, Any]):
+        await self._get_write_queue().put((sql, params))
+    
+    async def flush(self):
+        """Wait until every queued write has been committed."""
+        if self._write_queue is not None:
+            await self._get_write_queue().join()
+    
+    async def _flush_loop(self, queue: asyncio.Queue):
+        """Drain the queue in batches, committing each batch in one transaction."""
+        while True:
+            batch = [await queue.get()]
+            try:
+                try:
+                    # Give concurrent turns a moment to add their writes to this transaction
+                    await asyncio.sleep(WRITE_FLUSH_INTERVAL)
+                except asyncio.CancelledError:
+                    # The write already taken off the queue is committed before the task exits
+                    self._commit_batch(batch)
+                    raise
+                while len(batch) < WRITE_BATCH_SIZE and not queue.empty():
+                    batch.append(queue.get_nowait())
+                
+                # A thread can't be interrupted, so a batch being committed finishes even if the
+                # task is cancelled meanwhile
+                await asyncio.to_thread(self._commit_batch, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    def _commit_batch(self, batch: List[tuple]):
+        """Commit a batch of queued writes; if it fails, retry each write on its own.
         
-        for table_name, table_sql in tables.items():
-            cursor.execute(table_sql)
+        The callers of the queued writes have already returned, so one bad write must not
+        take the rest of the batch with it. Writes that fail on their own are logged.
+        """
+        try:
+            self._write_batch(batch)
+            return
+        except Exception:
+            if len(batch) == 1:
+                logger.exception("Failed to write a queued consultation update")
+                return
+            logger.warning(
+                "Failed to write %d queued consultation updates together; retrying one at a time",
+                len(batch), exc_info=True,
+            )
         
-        conn.commit()
-        conn.close()
+        for write in batch:
+            try:
+                self._write_batch([write])
+            except Exception:
+                logger.exception("Failed to write a queued consultation update")
+    
+    def _remember_consultation(self, session_id: str, consultation: Dict[str, Any]):
+        self._consultations[session_id] = consultation
+        self._consultations.move_to_end(session_id)
+        if len(self._consultations) > self.cache_size:
+            self._consultations.popitem(last=False)
+    
+    def _update_cached_consultation(self, session_id: str, updates: Dict[str, Any]):
+        # Mirrors the upsert: fields given as None keep their value
+        cached = self._consultations.get(session_id)
+        if cached is not None:
+            cached.update((key, value) for key, value in updates.items() if value is not None)
+    
+    def _fetch_all(self, sql: str, params: Dict[str, Any]) -> List[sqlite3.Row]:
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            return cursor.execute(sql, params).fetchall()
+    
+    def _write_batch(self, batch: List[tuple]):
+        # Rows without a timestamp of their own share one, taken once for the batch
+        now = _db_timestamp()
+        for _, params in batch:
+            params.setdefault("now", now)
+        # Consecutive writes with the same statement go through a single executemany
+        with self._transaction() as cursor:
+            for sql, group in groupby(batch, key=itemgetter(0)):
+                cursor.executemany(sql, [params for _, params in group])
     
-    def get_or_create_consultation(self, session_id: str, user_id: str = None) -> Dict[str, Any]:
+    def ensure_database_exists(self):
+        """Ensure the medical consultation database exists with proper tables."""
+        # Tables and indexes are created if they don't exist, in one transaction
+        with self._lock:
+            try:
+                self._conn.executescript(f"BEGIN;{CONSULTATION_SCHEMA}COMMIT;")
+            except sqlite3.Error:
+                # A script that fails partway leaves its transaction open on the shared connection
+                self._conn.rollback()
+                raise
+    
+    async def get_or_create_consultation(self, session_id: str, user_id: str = None) -> Dict[str, Any]:
         """Get existing consultation or create a new one."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Try to get existing consultation
-        cursor.execute(
-            "SELECT * FROM patient_consultations WHERE session_id = ?",
-            (session_id,)
-        )
-        result = cursor.fetchone()
-        
-        if result:
-            # Return existing consultation data
-            columns = [desc[0] for desc in cursor.description]
-            consultation_data = dict(zip(columns, result))
-            conn.close()
-            return consultation_data
+        # Queued writes are committed first, so the database matches the cache
+        await self.flush()
+        consultation = self._consultations.get(session_id)
+        if consultation is not None and await self._cache_is_current():
+            self._consultations.move_to_end(session_id)
         else:
-            # Create new consultation
-            cursor.execute("""
-                INSERT INTO patient_consultations 
-                (session_id, user_id, consultation_stage, symptoms_reported)
-                VALUES (?, ?, ?, ?)
-            """, (session_id, user_id, ConsultationStage.GREETING.value, "[]"))
-            
-            conn.commit()
-            conn.close()
-            
-            return {
-                "session_id": session_id,
-                "user_id": user_id,
-                "consultation_stage": ConsultationStage.GREETING.value,
-                "patient_name": None,
-                "patient_email": None,
-                "symptoms_reported": "[]",
-                "current_symptom_index": 0,
-                "current_question_index": 0,
-                "completed": False
-            }
+            consultation = await asyncio.to_thread(self._get_or_create_consultation, session_id, user_id)
+            self._remember_consultation(session_id, consultation)
+        return dict(consultation)
     
-    def update_consultation(self, session_id: str, **kwargs):
-        """Update consultation data."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Build dynamic update query
-        set_clauses = []
-        values = []
-        for key, value in kwargs.items():
-            if key in ['patient_name', 'patient_email', 'consultation_stage', 
-                      'symptoms_reported', 'current_symptom_index', 
-                      'current_question_index', 'completed', 'consultation_end_time']:
-                set_clauses.append(f"{key} = ?")
-                values.append(value)
+    def _read_data_version(self) -> int:
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    async def _cache_is_current(self) -> bool:
+        """Check that no other connection has committed since the cache was last validated.
         
-        if set_clauses:
-            set_clauses.append("updated_at = CURRENT_TIMESTAMP")
-            query = f"UPDATE patient_consultations SET {', '.join(set_clauses)} WHERE session_id = ?"
-            values.append(session_id)
-            cursor.execute(query, values)
-            conn.commit()
+        If one has, any cached row may be stale, so the whole cache is dropped.
+        """
+        data_version = await asyncio.to_thread(self._read_data_version)
+        if data_version == self._data_version:
+            return True
+        self._consultations.clear()
+        self._data_version = data_version
+        return False
+    
+    def _get_or_create_consultation(self, session_id: str, user_id: str = None) -> Dict[str, Any]:
+        with self._transaction() as cursor:
+            # Try to get existing consultation
+            cursor.execute(SQL_SELECT_CONSULTATION, {"session_id": session_id})
+            result = cursor.fetchone()
+            
+            if result:
+                # Return existing consultation data
+                return dict(zip(CONSULTATION_STATE_FIELDS, result))
+            
+            # Create new consultation; the upsert fills in the defaults for the missing fields
+            cursor.execute(
+                SQL_UPSERT_CONSULTATION,
+                {**dict.fromkeys(CONSULTATION_FIELDS), "session_id": session_id, "user_id": user_id,
+                 "now": _db_timestamp()}
+            )
         
-        conn.close()
+        return {
+            "session_id": session_id,
+            "user_id": user_id,
+            "consultation_stage": ConsultationStage.GREETING.value,
+            "patient_name": None,
+            "patient_email": None,
+            "symptoms_reported": "[]",
+            "current_symptom_index": 0,
+            "current_question_index": 0,
+            "completed": False
+        }
     
-    def save_patient_response(self, session_id: str, question_id: str, 
-                            question_text: str, category: str, response_text: str,
-                            symptom_name: str = None):
-        """Save a patient response to a question."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO patient_responses 
-            (session_id, question_id, question_text, question_category, 
-             response_text, symptom_name)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (session_id, question_id, question_text, category, response_text, symptom_name))
+    async def update_consultation(self, session_id: str, **kwargs):
+        """Queue an update of consultation data; fields that aren't given keep their values."""
+        values = dict.fromkeys(CONSULTATION_FIELDS)
+        updates = {key: value for key, value in kwargs.items() if key in UPDATABLE_CONSULTATION_FIELDS}
         
-        conn.commit()
-        conn.close()
+        if updates:
+            self._update_cached_consultation(session_id, updates)
+            values.update(updates, session_id=session_id)
+            await self._enqueue(SQL_UPSERT_CONSULTATION, values)
     
-    def save_consultation_summary(self, session_id: str, summary_text: str,
+    async def save_patient_response(self, session_id: str, question_id: str, 
+                            question_text: str, category: str, response_text: str,
+                            symptom_name: str = None, response_timestamp: str = None):
+        """Queue a patient response to a question."""
+        await self.save_patient_responses_bulk(session_id, [{
+            "question_id": question_id,
+            "question_text": question_text,
+            "category": category,
+            "response_text": response_text,
+            "symptom_name": symptom_name,
+            "response_timestamp": response_timestamp,
+        }])
+    
+    async def save_patient_responses_bulk(self, session_id: str, responses: List[Dict[str, Any]]):
+        """Queue several patient responses; they are committed in the same transaction."""
+        queue = self._get_write_queue()
+        for response in responses:
+            await queue.put((SQL_INSERT_RESPONSE, _response_params(session_id, response)))
+    
+    async def save_consultation_summary(self, session_id: str, summary_text: str,
                                  key_findings: List[str] = None, 
                                  red_flags: List[str] = None,
                                  recommendations: List[str] = None,
-                                 next_steps: List[str] = None):
-        """Save the final consultation summary."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT OR REPLACE INTO consultation_summaries 
-            (session_id, summary_text, key_findings, red_flags, recommendations, next_steps)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (session_id, summary_text, 
-              json.dumps(key_findings or []), 
-              json.dumps(red_flags or []),
-              json.dumps(recommendations or []),
-              json.dumps(next_steps or [])))
+                                 next_steps: List[str] = None,
+                                 responses: List[Dict[str, Any]] = None,
+                                 **kwargs):
+        """Save the final consultation summary.
         
-        conn.commit()
-        conn.close()
-    
-    def get_consultation_responses(self, session_id: str) -> List[Dict[str, Any]]:
-        """Get all responses for a consultation session."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        Responses (as for save_patient_responses_bulk) and consultation fields given as keyword
+        arguments (as for update_consultation) are written in the same transaction.
+        """
+        statements = [
+            (SQL_INSERT_RESPONSE, _response_params(session_id, response))
+            for response in responses or ()
+        ]
+        statements.append((SQL_SAVE_SUMMARY, {
+            "session_id": session_id,
+            "summary_text": summary_text,
+            "key_findings": orjson.dumps(key_findings or []).decode(),
+            "red_flags": orjson.dumps(red_flags or []).decode(),
+            "recommendations": orjson.dumps(recommendations or []).decode(),
+            "next_steps": orjson.dumps(next_steps or []).decode(),
+        }))
+        updates = {key: value for key, value in kwargs.items() if key in UPDATABLE_CONSULTATION_FIELDS}
         
-        cursor.execute("""
-            SELECT question_text, response_text, question_category, symptom_name
-            FROM patient_responses 
-            WHERE session_id = ?
-            ORDER BY response_timestamp
-        """, (session_id,))
+        if updates:
+            # Updates still queued for this consultation must not land after these
+            await self.flush()
+            self._update_cached_consultation(session_id, updates)
+            values = dict.fromkeys(CONSULTATION_FIELDS)
+            values.update(updates, session_id=session_id)
+            statements.append((SQL_UPSERT_CONSULTATION, values))
         
-        results = cursor.fetchall()
-        conn.close()
+        await asyncio.to_thread(self._write_batch, statements)
+    
+    async def get_consultation_responses(self, session_id: str) -> List[sqlite3.Row]:
+        """Get all responses for a consultation session.
         
-        return [
-            {
-                "question": row[0],
-                "response": row[1], 
-                "category": row[2],
-                "symptom": row[3]
-            }
-            for row in results
-        ]
+        Rows are indexed by "question", "response", "category" and "symptom".
+        """
+        await self.flush()
+        return await asyncio.to_thread(self._fetch_all, SQL_SELECT_RESPONSES, {"session_id": session_id})
 
 
 def create_patient_consultation_prompt() -> str:
-    current_date = datetime.now().strftime("%B %d, %Y")
+    return _consultation_prompt_for(date.today())
+
+
+@lru_cache(maxsize=1)
+def _consultation_prompt_for(today: date) -> str:
+    # Built once per day so the prompt is byte-identical across turns and providers can cache
+    # the prefix; the date is the only volatile part, so it goes last.
+    current_date = today.strftime("%B %d, %Y")
     return f"""
-    You are PatientBot, a compassionate medical consultation assistant. Today's date is {current_date}.
+    You are PatientBot, a compassionate medical consultation assistant.
 
     IMPORTANT: You are NOT a general chatbot. You have ONE specific job - collect patient information systematically.
 
@@ -276,20 +516,43 @@ def create_patient_consultation_prompt() -> str:
     - Use simple, patient-friendly language
     - Show empathy for patient concerns
     - Never provide medical advice or diagnosis
+
+    Today's date is {current_date}.
     """
 
 
+preprocessor = RunnableLambda(
+    lambda state: [SystemMessage(content=create_patient_consultation_prompt())] + state["messages"],
+    name="StateModifier",
+)
+
+
 def wrap_model(model: BaseChatModel) -> RunnableSerializable[PatientConsultationState, AIMessage]:
-    bound_model = model.bind_tools(tools)
-    preprocessor = RunnableLambda(
-        lambda state: [SystemMessage(content=create_patient_consultation_prompt())] + state["messages"],
-        name="StateModifier",
-    )
-    return preprocessor | bound_model
+    return preprocessor | model.bind_tools(tools)  # type: ignore[return-value]
 
 
-# Initialize the database helper
-medical_db = MedicalDatabase()
+@lru_cache(maxsize=1)
+def get_medical_db() -> MedicalDatabase:
+    """Open the consultation database on first use, so importing the agent has no side effects."""
+    return MedicalDatabase()
+
+
+async def _persist_turn(session_id: str, patient_data: Dict[str, Any], stage: ConsultationStage,
+                        question_index: int = None, symptom_index: int = None):
+    """Write everything known about the consultation after a turn as a single upsert.
+    
+    Values that are None (not collected yet) keep what is stored.
+    """
+    symptoms = patient_data.get("symptoms")
+    await get_medical_db().update_consultation(
+        session_id,
+        patient_name=patient_data.get("name"),
+        patient_email=patient_data.get("email"),
+        symptoms_reported=orjson.dumps(symptoms).decode() if symptoms else None,
+        consultation_stage=stage.value,
+        current_question_index=question_index,
+        current_symptom_index=symptom_index,
+    )
 
 
 async def initialize_consultation(state: PatientConsultationState, config: RunnableConfig, store: BaseStore) -> PatientConsultationState:
@@ -302,7 +565,7 @@ async def initialize_consultation(state: PatientConsultationState, config: Runna
     thread_id = config["configurable"].get("thread_id", "default")
     
     # Get or create consultation in SQLite database
-    consultation_data = medical_db.get_or_create_consultation(session_id, user_id)
+    consultation_data = await get_medical_db().get_or_create_consultation(session_id, user_id)
     
     # Convert stage string back to enum
     stage = ConsultationStage(consultation_data.get("consultation_stage", "greeting"))
@@ -310,8 +573,8 @@ async def initialize_consultation(state: PatientConsultationState, config: Runna
     # Parse symptoms from JSON
     symptoms_json = consultation_data.get("symptoms_reported", "[]")
     try:
-        symptoms = json.loads(symptoms_json) if symptoms_json else []
-    except json.JSONDecodeError:
+        symptoms = orjson.loads(symptoms_json) if symptoms_json else []
+    except orjson.JSONDecodeError:
         symptoms = []
     
     patient_data = {
@@ -319,6 +582,8 @@ async def initialize_consultation(state: PatientConsultationState, config: Runna
         "email": consultation_data.get("patient_email"),
         "symptoms": symptoms,
         "responses": {},
+        # Answers not written to SQLite yet; they are saved with the summary at the end
+        "pending_responses": state.get("patient_data", {}).get("pending_responses", []),
         "stage": stage.value,
         "consultation_complete": consultation_data.get("completed", False)
     }
@@ -343,7 +608,7 @@ async def collect_basic_info(state: PatientConsultationState, config: RunnableCo
     
     stage = state.get("consultation_stage", ConsultationStage.GREETING)
     patient_data = state.get("patient_data", {})
-    session_id = state.get("session_id", str(uuid4()))
+    session_id = state.get("session_id") or str(uuid4())
     
     if stage == ConsultationStage.GREETING:
         response = "Hello! I'm PatientBot, your medical consultation assistant. I'll help collect information about your symptoms for your healthcare provider.\n\nThis will take about 10-15 minutes. Let's start with your full name."
@@ -355,27 +620,13 @@ async def collect_basic_info(state: PatientConsultationState, config: RunnableCo
             response = f"Thank you, {patient_data['name']}. Now I need your email address for sending you the consultation summary."
             new_stage = stage
             
-            # Save to database
-            medical_db.update_consultation(
-                session_id, 
-                patient_name=patient_data["name"],
-                consultation_stage=new_stage.value
-            )
-            
         elif not patient_data.get("email") and user_input.strip():
             # Basic email validation
             email = user_input.strip()
-            if re.match(r'^[\w\.-]+@[\w\.-]+\.\w+$', email):
+            if EMAIL_RE.match(email):
                 patient_data["email"] = email
                 response = f"Perfect! Now, {patient_data['name']}, please tell me what symptoms or health concerns brought you here today. Describe them in your own words."
                 new_stage = ConsultationStage.COLLECTING_SYMPTOMS
-                
-                # Save to database
-                medical_db.update_consultation(
-                    session_id,
-                    patient_email=patient_data["email"],
-                    consultation_stage=new_stage.value
-                )
             else:
                 response = "Please provide a valid email address (example: name@email.com)."
                 new_stage = stage
@@ -393,13 +644,6 @@ async def collect_basic_info(state: PatientConsultationState, config: RunnableCo
             
             response = f"I understand you're experiencing: {', '.join(symptoms)}.\n\nNow I'll ask you some specific questions about each symptom to help your healthcare provider better understand your condition."
             new_stage = ConsultationStage.ASKING_FOLLOWUP_QUESTIONS
-            
-            # Save to database
-            medical_db.update_consultation(
-                session_id,
-                symptoms_reported=json.dumps(symptoms),
-                consultation_stage=new_stage.value
-            )
         else:
             response = "Please describe your symptoms or health concerns."
             new_stage = stage
@@ -409,6 +653,9 @@ async def collect_basic_info(state: PatientConsultationState, config: RunnableCo
     
     consultation_complete = (new_stage == ConsultationStage.COMPLETED)
     
+    # Save to database
+    await _persist_turn(session_id, patient_data, new_stage)
+    
     return {
         "messages": [AIMessage(content=response)],
         "consultation_stage": new_stage,
@@ -425,7 +672,7 @@ async def ask_followup_questions(state: PatientConsultationState, config: Runnab
     symptoms = patient_data.get("symptoms", [])
     current_symptom_index = state.get("current_symptom_index", 0)
     current_question_index = state.get("current_question_index", 0)
-    session_id = state.get("session_id", str(uuid4()))
+    session_id = state.get("session_id") or str(uuid4())
     
     # If no symptoms, go to summary
     if not symptoms:
@@ -439,25 +686,19 @@ async def ask_followup_questions(state: PatientConsultationState, config: Runnab
     if current_symptom_index < len(symptoms):
         current_symptom = symptoms[current_symptom_index]
         
-        # Simple predefined questions for each symptom
-        standard_questions = [
-            f"When did your {current_symptom} first start?",
-            f"How would you describe your {current_symptom} (mild, moderate, severe)?",
-            f"Does your {current_symptom} get worse with activity or at rest?",
-            f"Have you taken any medication for your {current_symptom}?",
-            "Do you have any other symptoms that occur along with this one?"
-        ]
-        
-        if current_question_index < len(standard_questions):
-            question = standard_questions[current_question_index]
+        if current_question_index < len(STANDARD_QUESTION_TEMPLATES):
+            question = STANDARD_QUESTION_TEMPLATES[current_question_index].format(s=current_symptom)
             
             # Save the question to database for tracking
             question_id = f"q_{current_symptom_index}_{current_question_index}"
             
             # Update database
-            medical_db.update_consultation(
+            await _persist_turn(
                 session_id,
-                current_question_index=current_question_index + 1
+                patient_data,
+                ConsultationStage.ASKING_FOLLOWUP_QUESTIONS,
+                question_index=current_question_index + 1,
+                symptom_index=current_symptom_index,
             )
             
             return {
@@ -474,7 +715,7 @@ async def ask_followup_questions(state: PatientConsultationState, config: Runnab
 
 
 async def store_response(state: PatientConsultationState, config: RunnableConfig) -> PatientConsultationState:
-    """Store patient response to the previous question in SQLite database."""
+    """Buffer the patient's response to the previous question until the summary is saved."""
     
     last_message = state["messages"][-1] if state["messages"] else None
     if isinstance(last_message, HumanMessage):
@@ -483,36 +724,28 @@ async def store_response(state: PatientConsultationState, config: RunnableConfig
         patient_data = state.get("patient_data", {})
         current_question_index = state.get("current_question_index", 0)
         current_symptom_index = state.get("current_symptom_index", 0)
-        session_id = state.get("session_id", str(uuid4()))
+        session_id = state.get("session_id") or str(uuid4())
         symptoms = patient_data.get("symptoms", [])
         
-        # Save the response to SQLite database
+        # Keep the response in the consultation state
         if symptoms and current_symptom_index < len(symptoms):
             current_symptom = symptoms[current_symptom_index]
             question_id = f"q_{current_symptom_index}_{current_question_index - 1}"
             
             # Determine which question was asked
-            standard_questions = [
-                f"When did your {current_symptom} first start?",
-                f"How would you describe your {current_symptom} (mild, moderate, severe)?",
-                f"Does your {current_symptom} get worse with activity or at rest?",
-                f"Have you taken any medication for your {current_symptom}?",
-                "Do you have any other symptoms that occur along with this one?"
-            ]
-            
-            question_idx = (current_question_index - 1) % len(standard_questions)
-            if question_idx < len(standard_questions):
-                question_text = standard_questions[question_idx]
+            question_idx = (current_question_index - 1) % len(STANDARD_QUESTION_TEMPLATES)
+            if question_idx < len(STANDARD_QUESTION_TEMPLATES):
+                question_text = STANDARD_QUESTION_TEMPLATES[question_idx].format(s=current_symptom)
                 
-                # Save response to database
-                medical_db.save_patient_response(
-                    session_id=session_id,
-                    question_id=question_id,
-                    question_text=question_text,
-                    category="symptom_details",
-                    response_text=user_input,
-                    symptom_name=current_symptom
-                )
+                patient_data.setdefault("pending_responses", []).append({
+                    "question_id": question_id,
+                    "question_text": question_text,
+                    "category": "symptom_details",
+                    "response_text": user_input,
+                    "symptom_name": current_symptom,
+                    # Saved with the summary later, so the answer time is taken now
+                    "response_timestamp": _db_timestamp(),
+                })
         
         return {
             "messages": [],
@@ -527,10 +760,20 @@ async def generate_consultation_summary(state: PatientConsultationState, config:
     """Generate the final consultation summary and save to SQLite database."""
     
     patient_data = state.get("patient_data", {})
-    session_id = state.get("session_id", str(uuid4()))
+    session_id = state.get("session_id") or str(uuid4())
+    
+    # Responses collected during the consultation; they are saved together with the summary
+    responses = patient_data.get("pending_responses", [])
+    
+    now = datetime.now()
     
-    # Get all responses from database
-    responses = medical_db.get_consultation_responses(session_id)
+    # One pass builds the response lines and picks out the severe findings
+    response_lines = []
+    key_findings = []
+    for resp in responses:
+        response_lines.append(f"• {resp['question_text']}: {resp['response_text']}")
+        if 'severe' in resp['response_text'].lower():
+            key_findings.append(resp['response_text'])
     
     summary = f"""
 ## Consultation Summary
@@ -538,13 +781,13 @@ async def generate_consultation_summary(state: PatientConsultationState, config:
 **Patient Information:**
 - Name: {patient_data.get('name', 'Not provided')}
 - Email: {patient_data.get('email', 'Not provided')}
-- Date: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
+- Date: {now.strftime('%B %d, %Y at %I:%M %p')}
 
 **Reported Symptoms:**
 {chr(10).join([f"• {symptom}" for symptom in patient_data.get('symptoms', [])])}
 
 **Responses Collected:**
-{chr(10).join([f"• {resp['question']}: {resp['response']}" for resp in responses])}
+{chr(10).join(response_lines)}
 
 ---
 
@@ -559,10 +802,11 @@ Thank you for your time, {patient_data.get('name', '')}! Your consultation is no
     """
     
     # Save summary to database
-    medical_db.save_consultation_summary(
+    await get_medical_db().save_consultation_summary(
         session_id=session_id,
         summary_text=summary.strip(),
-        key_findings=[resp['response'] for resp in responses if 'severe' in resp['response'].lower()],
+        responses=responses,
+        key_findings=key_findings,
         recommendations=[
             "Schedule appointment with healthcare provider",
             "Bring consultation summary to appointment",
@@ -572,16 +816,13 @@ Thank you for your time, {patient_data.get('name', '')}! Your consultation is no
             "Contact primary care physician",
             "Review summary before appointment",
             "Monitor symptoms"
-        ]
-    )
-    
-    # Mark consultation as completed
-    medical_db.update_consultation(
-        session_id,
+        ],
+        # Mark consultation as completed in the same transaction
         completed=True,
-        consultation_end_time=datetime.now().isoformat(),
+        consultation_end_time=now.isoformat(),
         consultation_stage=ConsultationStage.COMPLETED.value
     )
+    patient_data["pending_responses"] = []
     
     return {
         "messages": [AIMessage(content=summary.strip())],
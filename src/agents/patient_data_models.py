@@ -3,6 +3,9 @@ from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field, EmailStr
 from enum import Enum
 
+# Database schema for storing consultation data, re-exported from its single definition
+from memory.medical_schema import CONSULTATION_TABLES as CONSULTATION_TABLES
+
 
 class ConsultationStage(str, Enum):
     """Stages of patient consultation process."""
@@ -143,59 +146,6 @@ class ConsultationSummary(BaseModel):
         """.strip()
 
 
-# Database schema for storing consultation data
-CONSULTATION_TABLES = {
-    "patient_consultations": """
-    CREATE TABLE IF NOT EXISTS patient_consultations (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        session_id TEXT UNIQUE NOT NULL,
-        user_id TEXT,
-        patient_name TEXT,
-        patient_email TEXT,
-        consultation_stage TEXT NOT NULL,
-        symptoms_reported TEXT,  -- JSON array
-        current_symptom_index INTEGER DEFAULT 0,
-        current_question_index INTEGER DEFAULT 0,
-        consultation_start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        consultation_end_time TIMESTAMP,
-        completed BOOLEAN DEFAULT FALSE,
-        summary_generated BOOLEAN DEFAULT FALSE,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-    """,
-    
-    "patient_responses": """
-    CREATE TABLE IF NOT EXISTS patient_responses (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        session_id TEXT NOT NULL,
-        question_id TEXT NOT NULL,
-        question_text TEXT NOT NULL,
-        question_category TEXT NOT NULL,
-        response_text TEXT NOT NULL,
-        symptom_name TEXT,
-        response_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        follow_up_needed BOOLEAN DEFAULT FALSE,
-        FOREIGN KEY (session_id) REFERENCES patient_consultations (session_id)
-    );
-    """,
-    
-    "consultation_summaries": """
-    CREATE TABLE IF NOT EXISTS consultation_summaries (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        session_id TEXT UNIQUE NOT NULL,
-        summary_text TEXT NOT NULL,
-        key_findings TEXT,  -- JSON array
-        red_flags TEXT,     -- JSON array
-        recommendations TEXT, -- JSON array
-        next_steps TEXT,    -- JSON array
-        generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (session_id) REFERENCES patient_consultations (session_id)
-    );
-    """
-}
-
-
 def get_question_priority_order() -> List[QuestionCategory]:
     """Get the priority order for asking questions."""
     return [
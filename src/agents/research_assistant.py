@@ -46,7 +46,7 @@ instructions = f"""
     A few things to remember:
     - Please include markdown-formatted links to any citations used in your response. Only include one
     or two citations per response unless more are needed. ONLY USE LINKS RETURNED BY THE TOOLS.
-    - Use calculator tool with numexpr to answer math questions. The user does not understand numexpr,
+    - Use calculator tool to answer math questions. The user does not see the calculator input,
       so for the final response, use human readable format - e.g. "300 * 200", not "(300 \\times 200)".
     """
 
@@ -42,11 +42,6 @@
 # calculator.name = "Calculator"
 
 
-# # Format retrieved documents
-# def format_contexts(docs):
-#     return "\n\n".join(doc.page_content for doc in docs)
-
-
 # def load_chroma_db():
 #     # Create the embedding function for our project description database
 #     try:
@@ -78,41 +73,168 @@
 
 # database_search: BaseTool = tool(database_search_func)
 # database_search.name = "Database_Search"  # Update name with the purpose of your database
+import ast
+import heapq
 import math
+import operator
 import re
-import json
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, Iterator
 
-import numexpr
-from langchain_chroma import Chroma
+import orjson
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable, RunnableLambda
 from langchain_core.tools import BaseTool, tool
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.vectorstores import VectorStore
+
+from core import settings
+from core.settings import VectorBackend
+from memory.knowledge_base import check_embedding_backend, collection_metadata, create_embeddings
+from memory.vector_index import check_faiss_index_current
+
+# Same on-disk cache as scripts/setup_medical_system.py, so ingest and queries share embeddings
+EMBEDDING_CACHE_DIR = "./.embed_cache"
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+# Vector searches run in parallel by the batch follow-up question lookup
+SEARCH_WORKERS = 8
+
+# What the calculator tool may evaluate. Function names follow numexpr, which it used before.
+_MATH_OPERATORS: Dict[type, Callable[..., Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+_MATH_CONSTANTS = {"pi": math.pi, "e": math.e}
+_MATH_FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "arcsin": math.asin, "arccos": math.acos, "arctan": math.atan, "arctan2": math.atan2,
+    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
+    "arcsinh": math.asinh, "arccosh": math.acosh, "arctanh": math.atanh,
+    "log": math.log, "log10": math.log10, "log1p": math.log1p,
+    "exp": math.exp, "expm1": math.expm1, "sqrt": math.sqrt, "abs": abs,
+}
+# Integer arithmetic is exact in Python, so a huge power would take unbounded time and memory.
+# Integer results are capped at about 3900 digits, below the 4300 that str() converts.
+_MAX_INT_BITS = 13_000
+# A category header line, e.g. "Red Flags Questions:"
+_SECTION_HEADER_RE = re.compile(
+    r'^[ \t]*(?P<category>[^\n]*?'
+    r'(?:symptom details|vital signs|medical history|red flags|lifestyle|psychosocial)'
+    r'[^\n]*?):[ \t]*$',
+    re.I | re.M,
+)
+# A question line: numbered or bulleted (and not just a separator), or any line ending in "?"
+_QUESTION_RE = re.compile(
+    r'^[ \t]*(?:(?:\d+\.|[-•])[ \t]*(?P<listed>(?=[^\n]*\w)[^\n]*?)|(?P<asked>[^\n]*\?))[ \t]*$',
+    re.M,
+)
+
+# Question category priorities (1 = highest), looked up by lowercased category name
+QUESTION_CATEGORY_PRIORITIES = {
+    "Red Flags Questions": 1,
+    "Vital Signs Questions": 2,
+    "Symptom Details Questions": 3,
+    "Medical History Questions": 4,
+    "Past Medical History Questions": 5,
+    "Lifestyle Risk Factors Questions": 6,
+    "Psychosocial Questions": 7,
+}
+_CATEGORY_PRIORITY = {category.lower(): priority for category, priority in QUESTION_CATEGORY_PRIORITIES.items()}
+# Fallback for other header spellings, most specific first ("past medical history" before "medical history")
+_CATEGORY_PRIORITY_PATTERNS = (
+    ("red flag", 1),
+    ("vital sign", 2),
+    ("symptom detail", 3),
+    ("past medical history", 5),
+    ("medical history", 4),
+    ("lifestyle", 6),
+    ("risk factor", 6),
+    ("psychosocial", 7),
+)
+
+# Medical terms make_patient_friendly replaces with simpler language
+MEDICAL_TERM_REPLACEMENTS = {
+    "orthopnea": "difficulty breathing when lying down",
+    "paroxysmal nocturnal dyspnea": "suddenly waking up gasping for air",
+    "dyspnea": "shortness of breath",
+    "palpitations": "heart racing or irregular heartbeat",
+    "syncope": "fainting or losing consciousness",
+    "diaphoresis": "sweating",
+    "hemoptysis": "coughing up blood",
+    "oliguria": "decreased urination",
+    "nocturia": "frequent nighttime urination",
+    "bradycardia": "slow heart rate",
+    "tachycardia": "fast heart rate",
+}
+# Longest terms first, so "paroxysmal nocturnal dyspnea" wins over "dyspnea"
+_MEDICAL_TERM_RE = re.compile(
+    r"\b(?:" + "|".join(map(re.escape, sorted(MEDICAL_TERM_REPLACEMENTS, key=len, reverse=True))) + r")\b",
+    re.I,
+)
+
+
+def _evaluate_math(node: ast.AST) -> int | float:
+    """Evaluate a parsed expression, allowing only numbers, arithmetic and the math whitelist."""
+    if isinstance(node, ast.Expression):
+        return _evaluate_math(node.body)
+    if (
+        isinstance(node, ast.Constant)
+        and isinstance(node.value, (int, float))
+        and not isinstance(node.value, bool)
+    ):
+        return node.value
+    if isinstance(node, ast.Name) and node.id in _MATH_CONSTANTS:
+        return _MATH_CONSTANTS[node.id]
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _MATH_OPERATORS:
+        return _MATH_OPERATORS[type(node.op)](_evaluate_math(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in _MATH_OPERATORS:
+        left, right = _evaluate_math(node.left), _evaluate_math(node.right)
+        # A lower bound on the bits of an integer power, so it's refused before being computed
+        if (
+            isinstance(node.op, ast.Pow)
+            and isinstance(left, int)
+            and isinstance(right, int)
+            and (left.bit_length() - 1) * right > _MAX_INT_BITS
+        ):
+            raise ValueError(f"{ast.unparse(node)} is too large")
+        result = _MATH_OPERATORS[type(node.op)](left, right)
+        if isinstance(result, int) and result.bit_length() > _MAX_INT_BITS:
+            raise ValueError(f"{ast.unparse(node)} is too large")
+        return result
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in _MATH_FUNCTIONS
+        and not node.keywords
+    ):
+        return _MATH_FUNCTIONS[node.func.id](*map(_evaluate_math, node.args))
+    raise ValueError(f"unsupported expression element: {ast.unparse(node)}")
 
 
 def calculator_func(expression: str) -> str:
-    """Calculates a math expression using numexpr.
+    """Calculates a math expression.
 
-    Useful for when you need to answer questions about math using numexpr.
+    Useful for when you need to answer questions about math.
     This tool is only for math questions and nothing else. Only input
     math expressions.
 
     Args:
-        expression (str): A valid numexpr formatted math expression.
+        expression (str): A valid math expression using numbers, + - * / // % **,
+            pi, e and functions such as sqrt, log, exp, sin, cos or tan.
 
     Returns:
         str: The result of the math expression.
     """
 
     try:
-        local_dict = {"pi": math.pi, "e": math.e}
-        output = str(
-            numexpr.evaluate(
-                expression.strip(),
-                global_dict={},  # restrict access to globals
-                local_dict=local_dict,  # add common mathematical functions
-            )
-        )
-        return re.sub(r"^\[|\]$", "", output)
+        return str(_evaluate_math(ast.parse(expression.strip(), mode="eval")))
     except Exception as e:
         raise ValueError(
             f'calculator("{expression}") raised error: {e}.'
@@ -126,36 +248,151 @@ calculator.name = "Calculator"
 
 # Format retrieved documents
 def format_contexts(docs):
-    return "\n\n".join(doc.page_content for doc in docs)
+    return "\n\n".join([doc.page_content for doc in docs])
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Keeps recent query embeddings in memory in front of another embedding model."""
+
+    def __init__(self, embeddings: Embeddings, maxsize: int = QUERY_EMBEDDING_CACHE_SIZE):
+        self.embeddings = embeddings
+        self._embed_query = lru_cache(maxsize=maxsize)(embeddings.embed_query)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_query(text)
+
 
+@lru_cache(maxsize=1)
+def load_vector_store() -> VectorStore:
+    """Open the persisted vector database once and share it between tool calls."""
+    # Imported here so that loading the tools (and the service) doesn't pull in ChromaDB
+    # and the OpenAI client until a search actually runs
+    from langchain.embeddings import CacheBackedEmbeddings
+    from langchain.storage import LocalFileStore
+    from langchain_chroma import Chroma
 
-def load_chroma_db():
     # Create the embedding function for our project description database
     try:
-        embeddings = OpenAIEmbeddings()
+        underlying = create_embeddings(settings.EMBEDDING_BACKEND)
     except Exception as e:
         raise RuntimeError(
-            "Failed to initialize OpenAIEmbeddings. Ensure the OpenAI API key is set."
+            f"Failed to initialize {settings.EMBEDDING_BACKEND} embeddings. "
+            "For OpenAI, ensure the API key is set."
         ) from e
 
+    # Repeated queries are answered from memory, then from the on-disk cache, before the API.
+    # OpenAI embeddings name their model `model`, SentenceTransformers ones `model_name`.
+    embeddings = CachedQueryEmbeddings(
+        CacheBackedEmbeddings.from_bytes_store(
+            underlying,
+            LocalFileStore(EMBEDDING_CACHE_DIR),
+            namespace=getattr(underlying, "model", None) or getattr(underlying, "model_name"),
+            query_embedding_cache=True,
+        )
+    )
+
     # Load the stored vector database
-    chroma_db = Chroma(persist_directory="./chroma_db", embedding_function=embeddings)
-    retriever = chroma_db.as_retriever(search_kwargs={"k": 5})
-    return retriever
+    if settings.VECTOR_BACKEND == VectorBackend.FAISS:
+        from langchain_community.vectorstores import FAISS
+
+        check_faiss_index_current(
+            settings.FAISS_INDEX_PATH, settings.CHROMA_DB_PATH, settings.EMBEDDING_BACKEND
+        )
+        # The pickled docstore is our own output from scripts/build_faiss_index.py
+        return FAISS.load_local(
+            settings.FAISS_INDEX_PATH, embeddings, allow_dangerous_deserialization=True
+        )
+    store = Chroma(
+        persist_directory=settings.CHROMA_DB_PATH,
+        embedding_function=embeddings,
+        collection_metadata=collection_metadata(settings.EMBEDDING_BACKEND),
+    )
+    check_embedding_backend(store._collection.metadata, settings.EMBEDDING_BACKEND)
+    return store
+
+
+def load_chroma_db(k: int = 5):
+    # The retriever is a thin wrapper, so it's rebuilt per call around the cached store
+    return load_vector_store().as_retriever(search_kwargs={"k": k})
+
+
+@lru_cache(maxsize=1)
+def load_database_search_chain() -> Runnable[str, str]:
+    """Build the retrieval pipeline once: search the database, then format the documents."""
+    return load_chroma_db() | RunnableLambda(format_contexts)
 
 
 def database_search_func(query: str) -> str:
     """Searches chroma_db for information in the company's handbook."""
-    # Get the chroma retriever
-    retriever = load_chroma_db()
+    # Search the database for relevant documents and format them into a string
+    return load_database_search_chain().invoke(query)
+
 
-    # Search the database for relevant documents
-    documents = retriever.invoke(query)
+@lru_cache(maxsize=512)
+def _lookup_followup_questions(symptom: str) -> Dict[str, Any]:
+    # The knowledge base is static while the service runs, so results are cached per symptom
+    # and shared between callers, which must not modify them. Failures raise and are not cached.
+    vector_store = load_vector_store()
+    query = f"medical symptom {symptom} follow-up questions assessment"
+    
+    # Search specifically for medical symptoms; the store filters on type, and metadata filters
+    # can't match substrings, so the symptom itself is checked on the results
+    documents = vector_store.similarity_search(query, k=5, filter={"type": "medical_symptom"})
+    if not any(symptom in doc.metadata.get("symptom", "").lower() for doc in documents):
+        # Fallback to general search
+        documents = vector_store.similarity_search(query, k=5)
+    
+    # Filter for medical symptom documents
+    medical_docs = [
+        doc for doc in documents 
+        if doc.metadata.get("type") == "medical_symptom" 
+        and symptom in doc.metadata.get("symptom", "").lower()
+    ]
+    
+    if not medical_docs:
+        # Fallback to general search, lowercasing each (possibly long) document only once
+        medical_docs = [
+            doc for doc in documents 
+            if "symptom" in (content_lower := doc.page_content.lower())
+            and symptom in content_lower
+        ]
+    
+    if medical_docs:
+        # Extract the most relevant document
+        best_doc = medical_docs[0]
+        
+        # Parse the content to extract structured questions
+        return parse_symptom_questions(best_doc.page_content, symptom)
+    else:
+        return {
+            "symptom": symptom,
+            "questions": [],
+            "message": f"No specific follow-up questions found for {symptom}. Please use general assessment questions."
+        }
+
+
+def _get_symptom_followup_questions(symptom: str) -> Dict[str, Any]:
+    return _lookup_followup_questions(symptom.strip().lower())
 
-    # Format the documents into a string
-    context_str = format_contexts(documents)
 
-    return context_str
+def clear_tool_caches():
+    """Drop the cached vector store and lookups, e.g. after the knowledge base is rebuilt."""
+    load_vector_store.cache_clear()
+    load_database_search_chain.cache_clear()
+    _lookup_followup_questions.cache_clear()
+
+
+def _followup_questions_or_error(symptom: str) -> Dict[str, Any]:
+    try:
+        return _get_symptom_followup_questions(symptom)
+    except Exception as e:
+        return {
+            "error": f"Error retrieving questions for {symptom}: {str(e)}",
+            "questions": []
+        }
 
 
 def get_symptom_followup_questions_func(symptom: str) -> str:
@@ -168,49 +405,33 @@ def get_symptom_followup_questions_func(symptom: str) -> str:
     Returns:
         str: JSON string containing organized follow-up questions by category
     """
+    return orjson.dumps(_followup_questions_or_error(symptom)).decode()
+
+
+def get_symptom_followup_questions_batch_func(symptoms: List[str]) -> str:
+    """
+    Retrieves structured follow-up questions for several symptoms at once.
+    
+    Args:
+        symptoms (List[str]): The symptoms to search for (e.g., ["chest pain", "fever"])
+    
+    Returns:
+        str: JSON string mapping each symptom to its organized follow-up questions
+    """
     try:
-        # Get the chroma retriever
-        retriever = load_chroma_db()
-        
-        # Search specifically for medical symptoms
-        query = f"medical symptom {symptom} follow-up questions assessment"
-        documents = retriever.invoke(query)
-        
-        # Filter for medical symptom documents
-        medical_docs = [
-            doc for doc in documents 
-            if doc.metadata.get("type") == "medical_symptom" 
-            and symptom.lower() in doc.metadata.get("symptom", "").lower()
-        ]
-        
-        if not medical_docs:
-            # Fallback to general search
-            medical_docs = [
-                doc for doc in documents 
-                if "symptom" in doc.page_content.lower() 
-                and symptom.lower() in doc.page_content.lower()
-            ]
-        
-        if medical_docs:
-            # Extract the most relevant document
-            best_doc = medical_docs[0]
-            
-            # Parse the content to extract structured questions
-            questions_data = parse_symptom_questions(best_doc.page_content, symptom)
-            
-            return json.dumps(questions_data, indent=2)
-        else:
-            return json.dumps({
-                "symptom": symptom,
-                "questions": [],
-                "message": f"No specific follow-up questions found for {symptom}. Please use general assessment questions."
-            })
-            
+        # Opened once here rather than by several lookup threads at the same time
+        load_vector_store()
     except Exception as e:
-        return json.dumps({
-            "error": f"Error retrieving questions for {symptom}: {str(e)}",
+        return orjson.dumps({
+            "error": f"Error retrieving questions for {', '.join(symptoms)}: {str(e)}",
             "questions": []
-        })
+        }).decode()
+    
+    # Same cached lookup as the single-symptom tool, run concurrently; symptoms already looked
+    # up cost no embedding request or search
+    with ThreadPoolExecutor(max_workers=min(len(symptoms), SEARCH_WORKERS) or 1) as pool:
+        results = pool.map(_followup_questions_or_error, symptoms)
+        return orjson.dumps(dict(zip(symptoms, results))).decode()
 
 
 def parse_symptom_questions(content: str, symptom: str) -> Dict[str, Any]:
@@ -225,34 +446,23 @@ def parse_symptom_questions(content: str, symptom: str) -> Dict[str, Any]:
         Dict: Structured questions organized by category
     """
     questions_by_category = {}
-    current_category = None
     
-    lines = content.split('\n')
-    
-    for line in lines:
-        line = line.strip()
-        
-        # Identify category headers
-        if line.endswith(':') and any(keyword in line.lower() for keyword in 
-                                    ['symptom details', 'vital signs', 'medical history', 
-                                     'red flags', 'lifestyle', 'psychosocial']):
-            current_category = line.rstrip(':')
-            questions_by_category[current_category] = []
+    # Each category section runs from its header to the next category header
+    headers = list(_SECTION_HEADER_RE.finditer(content))
+    for header, next_header in zip(headers, headers[1:] + [None]):
+        category = header.group("category").strip()
+        priority = get_question_priority(category)
+        section = content[header.end():next_header.start() if next_header else len(content)]
         
-        # Extract questions (lines starting with numbers or bullet points)
-        elif current_category and (line.startswith(('1.', '2.', '3.', '4.', '5.', '-', '•')) or 
-                                 line.endswith('?')):
-            # Clean up the question text
-            question = re.sub(r'^\d+\.\s*', '', line)
-            question = re.sub(r'^[-•]\s*', '', question)
-            question = question.strip()
-            
-            if question and len(question) > 10:  # Filter out very short lines
-                questions_by_category[current_category].append({
-                    "text": question,
-                    "category": current_category,
-                    "priority": get_question_priority(current_category)
-                })
+        questions_by_category[category] = [
+            {
+                "text": question,
+                "category": category,
+                "priority": priority
+            }
+            for match in _QUESTION_RE.finditer(section)
+            if len(question := match.group("listed") or match.group("asked")) > 10  # Filter out very short lines
+        ]
     
     # Structure the response
     return {
@@ -266,36 +476,36 @@ def parse_symptom_questions(content: str, symptom: str) -> Dict[str, Any]:
 
 def get_question_priority(category: str) -> int:
     """Assign priority to question categories (1 = highest priority)."""
-    priority_map = {
-        "Red Flags Questions": 1,
-        "Vital Signs Questions": 2,
-        "Symptom Details Questions": 3,
-        "Medical History Questions": 4,
-        "Past Medical History Questions": 5,
-        "Lifestyle Risk Factors Questions": 6,
-        "Psychosocial Questions": 7
-    }
-    
-    # Find matching category (case-insensitive, partial match)
-    for key, priority in priority_map.items():
-        if any(word in category.lower() for word in key.lower().split()):
-            return priority
-    
-    return 8  # Default priority
+    key = category.lower()
+    return _CATEGORY_PRIORITY.get(key) or _partial_category_priority(key)
 
 
-def get_prioritized_questions(questions_by_category: Dict[str, List[Dict]]) -> List[Dict]:
-    """Get all questions sorted by priority."""
-    all_questions = []
-    
+@lru_cache(maxsize=256)
+def _partial_category_priority(key: str) -> int:
+    # Partial match on the distinctive words of a category; "questions" alone matches nothing
+    return next(
+        (priority for pattern, priority in _CATEGORY_PRIORITY_PATTERNS if pattern in key),
+        8,  # Default priority
+    )
+
+
+def _prioritized_entries(questions_by_category: Dict[str, List[Dict]]) -> Iterator[tuple]:
+    """Yield (priority, category, position, question) tuples, which sort in priority order.
+
+    The position keeps questions of equal priority and category in document order, and means
+    the question dicts themselves are never compared.
+    """
+    position = 0
     for category, questions in questions_by_category.items():
         for question in questions:
-            all_questions.append(question)
-    
+            yield question.get("priority", 8), question.get("category", ""), position, question
+            position += 1
+
+
+def get_prioritized_questions(questions_by_category: Dict[str, List[Dict]]) -> List[Dict]:
+    """Get all questions sorted by priority."""
     # Sort by priority, then by category
-    all_questions.sort(key=lambda x: (x.get("priority", 8), x.get("category", "")))
-    
-    return all_questions
+    return [entry[-1] for entry in sorted(_prioritized_entries(questions_by_category))]
 
 
 def get_patient_friendly_questions_func(symptom: str, max_questions: int = 10) -> str:
@@ -311,21 +521,23 @@ def get_patient_friendly_questions_func(symptom: str, max_questions: int = 10) -
     """
     try:
         # Get structured questions
-        questions_json = get_symptom_followup_questions_func(symptom)
-        questions_data = json.loads(questions_json)
-        
-        if "error" in questions_data:
+        try:
+            questions_data = _get_symptom_followup_questions(symptom)
+        except Exception:
             return f"I couldn't find specific questions for {symptom}. Let me ask you some general questions about your symptoms."
         
-        # Get prioritized questions
-        prioritized_questions = questions_data.get("prioritized_questions", [])
+        # Get the highest priority questions without sorting all of them
+        selected_questions = [
+            entry[-1]
+            for entry in heapq.nsmallest(
+                max_questions, _prioritized_entries(questions_data.get("questions_by_category", {}))
+            )
+        ]
         
-        if not prioritized_questions:
+        if not selected_questions:
             return f"Let me ask you some questions about your {symptom}."
         
         # Format for patient interaction
-        selected_questions = prioritized_questions[:max_questions]
-        
         formatted_questions = []
         for i, q in enumerate(selected_questions, 1):
             # Make questions more patient-friendly
@@ -341,28 +553,14 @@ def get_patient_friendly_questions_func(symptom: str, max_questions: int = 10) -
 def make_patient_friendly(question: str) -> str:
     """Convert medical questions to patient-friendly language."""
     
-    # Replace medical terms with simpler language
-    replacements = {
-        "orthopnea": "difficulty breathing when lying down",
-        "paroxysmal nocturnal dyspnea": "suddenly waking up gasping for air",
-        "dyspnea": "shortness of breath",
-        "palpitations": "heart racing or irregular heartbeat",
-        "syncope": "fainting or losing consciousness",
-        "diaphoresis": "sweating",
-        "hemoptysis": "coughing up blood",
-        "oliguria": "decreased urination",
-        "nocturia": "frequent nighttime urination",
-        "bradycardia": "slow heart rate",
-        "tachycardia": "fast heart rate",
-    }
-    
-    question_lower = question.lower()
-    for medical_term, friendly_term in replacements.items():
-        question_lower = question_lower.replace(medical_term, friendly_term)
+    # Replace medical terms with simpler language, in one pass over the question
+    question = _MEDICAL_TERM_RE.sub(
+        lambda match: MEDICAL_TERM_REPLACEMENTS[match.group(0).lower()], question
+    )
     
     # Capitalize first letter
-    if question_lower:
-        question = question_lower[0].upper() + question_lower[1:]
+    if question:
+        question = question[0].upper() + question[1:]
     
     return question
 
@@ -374,5 +572,8 @@ database_search.name = "Database_Search"
 get_symptom_followup_questions: BaseTool = tool(get_symptom_followup_questions_func)
 get_symptom_followup_questions.name = "Get_Symptom_Followup_Questions"
 
+get_symptom_followup_questions_batch: BaseTool = tool(get_symptom_followup_questions_batch_func)
+get_symptom_followup_questions_batch.name = "Get_Symptom_Followup_Questions_Batch"
+
 get_patient_friendly_questions: BaseTool = tool(get_patient_friendly_questions_func)
 get_patient_friendly_questions.name = "Get_Patient_Friendly_Questions"
\ No newline at end of file
@@ -37,6 +37,16 @@ class DatabaseType(StrEnum):
     MONGO = "mongo"
 
 
+class VectorBackend(StrEnum):
+    CHROMA = "chroma"
+    FAISS = "faiss"
+
+
+class EmbeddingBackend(StrEnum):
+    OPENAI = "openai"
+    HUGGINGFACE = "huggingface"
+
+
 def check_str_is_http(x: str) -> str:
     http_url_adapter = TypeAdapter(HttpUrl)
     return str(http_url_adapter.validate_python(x))
@@ -54,6 +64,8 @@ class Settings(BaseSettings):
 
     HOST: str = "0.0.0.0"
     PORT: int = 8080
+    # Uvicorn worker processes outside dev mode
+    WORKERS: int = 1
 
     AUTH_SECRET: SecretStr | None = None
 
@@ -98,6 +110,14 @@ class Settings(BaseSettings):
     )  # Options: DatabaseType.SQLITE or DatabaseType.POSTGRES
     SQLITE_DB_PATH: str = "checkpoints.db"
 
+    # Vector store searched by the agent tools
+    VECTOR_BACKEND: VectorBackend = VectorBackend.CHROMA
+    CHROMA_DB_PATH: str = "./chroma_db"
+    # Built from the Chroma store by scripts/build_faiss_index.py; used when VECTOR_BACKEND=faiss
+    FAISS_INDEX_PATH: str = "./faiss_index"
+    # Must match the backend the store was built with (scripts/create_chroma_db.py --embeddings)
+    EMBEDDING_BACKEND: EmbeddingBackend = EmbeddingBackend.OPENAI
+
     # PostgreSQL Configuration
     POSTGRES_USER: str | None = None
     POSTGRES_PASSWORD: SecretStr | None = None
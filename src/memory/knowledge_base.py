@@ -0,0 +1,154 @@
+"""The Chroma collection the agent tools search, as written by the ingest scripts.
+
+scripts/create_chroma_db.py and scripts/setup_medical_system.py both write this collection, so
+everything that decides what ends up in it is defined here once.
+"""
+
+import hashlib
+from collections.abc import Mapping
+from itertools import chain
+from typing import Any
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+# LangChain's default collection name, so the agents' Chroma wrapper finds it
+COLLECTION_NAME = "langchain"
+
+# HNSW settings applied when the collection is first created. Chroma fixes them at creation, so
+# changing them requires rebuilding the store. Cosine distance is the metric
+# scripts/build_faiss_index.py reproduces. A denser graph (M, construction_ef) costs more once at
+# build time and keeps recall high for the agents' small-k queries at a modest search_ef. A
+# larger batch size and sync threshold flush the index to disk far less often during bulk ingest,
+# at the cost of replaying more of the write-ahead log if the process crashes mid-build.
+HNSW_COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 32,
+    "hnsw:construction_ef": 200,
+    "hnsw:search_ef": 64,
+    "hnsw:batch_size": 1000,
+    "hnsw:sync_threshold": 10000,
+}
+
+# Collection metadata key recording which embedding backend the store was built with. Vectors
+# from different models aren't comparable, so a store is only searched with its own backend.
+# Stores created before it was recorded were all built with OpenAI.
+EMBEDDING_BACKEND_KEY = "embedding_backend"
+
+# Model used by the "huggingface" embedding backend
+LOCAL_EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+
+# Section separators used in the generated symptom documents
+_SEP_MAJOR = "=" * 60
+_SEP_MINOR = "-" * 40
+
+
+def chunk_id(doc: Document) -> str:
+    """Content-addressed Chroma id, so re-ingesting an unchanged chunk is a no-op.
+
+    Both ingest scripts use these ids, so a chunk they both ingest is stored once.
+    """
+    return hashlib.blake2b(doc.page_content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def collection_metadata(embedding_backend: str) -> dict[str, Any]:
+    """Metadata a new collection is created with: the HNSW settings and the embedding backend."""
+    return {**HNSW_COLLECTION_METADATA, EMBEDDING_BACKEND_KEY: str(embedding_backend)}
+
+
+def check_embedding_backend(metadata: Mapping[str, Any] | None, embedding_backend: str) -> None:
+    """Raise RuntimeError if the store described by metadata was built with another backend."""
+    built_with = (metadata or {}).get(EMBEDDING_BACKEND_KEY, "openai")
+    if built_with != embedding_backend:
+        raise RuntimeError(
+            f"The vector store was built with {built_with} embeddings and can't be searched with "
+            f"{embedding_backend} ones. Set EMBEDDING_BACKEND={built_with}, or rebuild the store "
+            f"with scripts/create_chroma_db.py --rebuild --embeddings {embedding_backend}."
+        )
+
+
+def check_collection_metadata(metadata: Mapping[str, Any] | None, embedding_backend: str) -> None:
+    """Raise RuntimeError unless an existing collection can be written with these settings.
+
+    Chroma keeps the metadata a collection was created with and ignores what is passed when it
+    is reopened, so a store built with other HNSW settings would silently keep them.
+    """
+    current = metadata or {}
+    differing = {
+        key: current.get(key)
+        for key, value in HNSW_COLLECTION_METADATA.items()
+        if current.get(key) != value
+    }
+    if differing:
+        raise RuntimeError(
+            f"The vector store was created with other HNSW settings ({differing}, expected "
+            f"{HNSW_COLLECTION_METADATA}). Rebuild it with scripts/create_chroma_db.py --rebuild."
+        )
+    check_embedding_backend(metadata, embedding_backend)
+
+
+def create_embeddings(backend: str) -> Embeddings:
+    """Create the embedding model for a backend.
+
+    "openai" calls the OpenAI API; "huggingface" runs a small local SentenceTransformers model
+    offline.
+    """
+    if backend == "openai":
+        from langchain_openai import OpenAIEmbeddings
+
+        return OpenAIEmbeddings(chunk_size=1000, max_retries=6)
+    if backend == "huggingface":
+        try:
+            from langchain_huggingface import HuggingFaceEmbeddings
+        except ImportError as e:
+            raise RuntimeError(
+                "Local embeddings require langchain-huggingface. "
+                "Install it with `uv sync --group local-embeddings`."
+            ) from e
+        # SentenceTransformers picks CUDA automatically when it is available
+        return HuggingFaceEmbeddings(
+            model_name=LOCAL_EMBEDDING_MODEL,
+            encode_kwargs={"batch_size": 128, "normalize_embeddings": True},
+        )
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def symptom_document(item: dict[str, Any]) -> Document:
+    """Turn one entry of the medical symptoms JSON into the document stored for it.
+
+    The follow-up questions are listed by category, the layout agents.tools.parse_symptom_questions
+    reads back. Chroma metadata values must be scalars, so lists are stored comma-joined.
+    """
+    symptom = item.get("symptom", "")
+    follow_up_questions = item.get("follow_up_questions", {})
+
+    # Searchable keywords: the symptom plus its category names
+    keywords = [symptom.lower(), *(category.replace("_", " ") for category in follow_up_questions)]
+
+    content_parts = [
+        f"Medical Symptom: {symptom}",
+        _SEP_MAJOR,
+        *chain.from_iterable(
+            (
+                f"\n{category.replace('_', ' ').title()} Questions:",
+                _SEP_MINOR,
+                *(f"{i}. {question}" for i, question in enumerate(questions, 1)),
+                "",
+            )
+            for category, questions in follow_up_questions.items()
+        ),
+        "\nSearchable Keywords:",
+        ", ".join(keywords),
+    ]
+
+    return Document(
+        page_content="\n".join(content_parts),
+        metadata={
+            "symptom": symptom,
+            "source": "medical_symptoms_database",
+            "type": "medical_symptom",
+            "categories": ",".join(follow_up_questions),
+            "total_questions": sum(map(len, follow_up_questions.values())),
+            "search_keywords": ",".join(keywords),
+        },
+    )
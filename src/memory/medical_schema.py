@@ -0,0 +1,73 @@
+"""SQLite schema of the medical consultation database.
+
+This is the only copy: the consultation agent, memory.initialize_medical_database and
+scripts/setup_medical_system.py all create the database from it. Every statement is
+idempotent, so the schema can be applied to an existing database.
+"""
+
+# Timestamp columns have no CURRENT_TIMESTAMP default; the consultation agent writes them
+CONSULTATION_TABLES = {
+    "patient_consultations": """
+        CREATE TABLE IF NOT EXISTS patient_consultations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT UNIQUE NOT NULL,
+            user_id TEXT,
+            patient_name TEXT,
+            patient_email TEXT,
+            consultation_stage TEXT NOT NULL,
+            symptoms_reported TEXT,  -- JSON array
+            current_symptom_index INTEGER DEFAULT 0,
+            current_question_index INTEGER DEFAULT 0,
+            consultation_start_time TIMESTAMP,
+            consultation_end_time TIMESTAMP,
+            completed BOOLEAN DEFAULT FALSE,
+            summary_generated BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP,
+            updated_at TIMESTAMP
+        );
+    """,
+    "patient_responses": """
+        CREATE TABLE IF NOT EXISTS patient_responses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            question_id TEXT NOT NULL,
+            question_text TEXT NOT NULL,
+            question_category TEXT NOT NULL,
+            response_text TEXT NOT NULL,
+            symptom_name TEXT,
+            response_timestamp TIMESTAMP,
+            follow_up_needed BOOLEAN DEFAULT FALSE,
+            FOREIGN KEY (session_id) REFERENCES patient_consultations (session_id)
+        );
+    """,
+    "consultation_summaries": """
+        CREATE TABLE IF NOT EXISTS consultation_summaries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT UNIQUE NOT NULL,
+            summary_text TEXT NOT NULL,
+            key_findings TEXT,  -- JSON array
+            red_flags TEXT,     -- JSON array
+            recommendations TEXT, -- JSON array
+            next_steps TEXT,    -- JSON array
+            generated_at TIMESTAMP,
+            FOREIGN KEY (session_id) REFERENCES patient_consultations (session_id)
+        );
+    """,
+}
+
+# Responses are read per session in the order they were given: by answer time, with the rowid
+# (the last column of every index) breaking ties. (completed, consultation_start_time DESC)
+# serves the completed-consultation listing in scripts/database_utils.py without a sort. The
+# session_id columns of the other tables are UNIQUE and therefore already indexed.
+CONSULTATION_INDEXES = """
+    CREATE INDEX IF NOT EXISTS idx_pr_session_ts
+        ON patient_responses(session_id, response_timestamp);
+    CREATE INDEX IF NOT EXISTS idx_pc_completed_start
+        ON patient_consultations(completed, consultation_start_time DESC);
+    CREATE INDEX IF NOT EXISTS idx_pc_start_time ON patient_consultations(consultation_start_time);
+    CREATE INDEX IF NOT EXISTS idx_pc_user ON patient_consultations(user_id);
+"""
+
+# Every table and index, in one script for executescript; wrap it in BEGIN/COMMIT to apply it
+# in a single transaction
+CONSULTATION_SCHEMA = "".join(CONSULTATION_TABLES.values()) + CONSULTATION_INDEXES
@@ -0,0 +1,56 @@
+"""Keeps the FAISS copy of the Chroma store (scripts/build_faiss_index.py) in step with it."""
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import orjson
+
+from memory.knowledge_base import EMBEDDING_BACKEND_KEY, check_embedding_backend
+
+# Written next to the FAISS index: the state of the Chroma store it was built from
+FAISS_SOURCE_FILE = "chroma_source.json"
+
+
+def chroma_fingerprint(chroma_dir: str) -> list[list]:
+    """Identify the current contents of the Chroma store persisted in chroma_dir.
+
+    Chroma numbers every add, update and delete, and records per segment the last number it
+    applied; segment ids are new whenever a collection is recreated. Unlike file modification
+    times, which change whenever the store is merely opened, this only changes on writes.
+    """
+    uri = Path(chroma_dir, "chroma.sqlite3").resolve().as_uri() + "?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True)) as conn:
+        return [
+            list(row)
+            for row in conn.execute("SELECT segment_id, seq_id FROM max_seq_id ORDER BY segment_id")
+        ]
+
+
+def write_faiss_source(index_dir: str, fingerprint: list[list], embedding_backend: str) -> None:
+    """Record which state of the Chroma store the FAISS index in index_dir was built from.
+
+    The embedding backend the store was built with is recorded too, under the same key as in the
+    Chroma collection metadata.
+    """
+    Path(index_dir, FAISS_SOURCE_FILE).write_bytes(
+        orjson.dumps({"chroma": fingerprint, EMBEDDING_BACKEND_KEY: str(embedding_backend)})
+    )
+
+
+def check_faiss_index_current(index_dir: str, chroma_dir: str, embedding_backend: str) -> None:
+    """Raise RuntimeError unless the FAISS index was built from the current Chroma store and can
+    be searched with embedding_backend."""
+    source = Path(index_dir, FAISS_SOURCE_FILE)
+    if not source.is_file():
+        raise RuntimeError(
+            f"No FAISS index built from the Chroma store in {index_dir}. "
+            "Build it with scripts/build_faiss_index.py."
+        )
+    recorded = orjson.loads(source.read_bytes())
+    if recorded["chroma"] != chroma_fingerprint(chroma_dir):
+        raise RuntimeError(
+            f"The FAISS index in {index_dir} is older than the Chroma store in {chroma_dir}. "
+            "Rebuild it with scripts/build_faiss_index.py."
+        )
+    check_embedding_backend(recorded, embedding_backend)
@@ -1,4 +1,5 @@
 import asyncio
+import sys
 import uvicorn
 from dotenv import load_dotenv
 from core import settings
@@ -8,9 +9,19 @@ load_dotenv()
 if __name__ == "__main__":
     # Linux uses the default event loop policy which works well with async database drivers
     # No need for Windows-specific event loop policy adjustments
+
+    # Reload only works with a single process, so dev runs one worker
+    workers = 1 if settings.is_dev() else settings.WORKERS
+
     uvicorn.run(
         "service:app", 
         host=settings.HOST, 
         port=settings.PORT, 
-        reload=settings.is_dev()
+        reload=settings.is_dev(),
+        workers=workers,
+        # Keep idle client connections open so repeat polling reuses them
+        timeout_keep_alive=30,
+        # libuv-based event loop (not available on Windows) and the C HTTP parser
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
     )
\ No newline at end of file
@@ -0,0 +1,234 @@
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+from agents.patient_consultation_agent import (
+    CONSULTATION_FIELDS,
+    SQL_INSERT_RESPONSE,
+    SQL_UPSERT_CONSULTATION,
+    MedicalDatabase,
+)
+from memory.medical_schema import CONSULTATION_TABLES
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "consultations.db")
+
+
+@pytest_asyncio.fixture
+async def db(db_path):
+    database = MedicalDatabase(db_path)
+    yield database
+    # Closed on the test's event loop, so queued writes and the writer task finish there
+    await database.aclose()
+
+
+def read_consultation(db_path: str, session_id: str) -> dict:
+    with sqlite3.connect(db_path) as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute(
+            "SELECT * FROM patient_consultations WHERE session_id = ?", (session_id,)
+        ).fetchone()
+    return dict(row)
+
+
+def test_schema_created(db, db_path) -> None:
+    with sqlite3.connect(db_path) as conn:
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    assert set(CONSULTATION_TABLES) <= names
+    assert "idx_pr_session_ts" in names
+
+
+@pytest.mark.asyncio
+async def test_update_consultation_keeps_unset_fields(db, db_path) -> None:
+    created = await db.get_or_create_consultation("s1", "user-1")
+    assert created["consultation_stage"] == "greeting"
+
+    await db.update_consultation("s1", patient_name="Ada")
+    await db.update_consultation("s1", patient_email="ada@example.com", current_question_index=2)
+    await db.flush()
+
+    row = read_consultation(db_path, "s1")
+    assert row["user_id"] == "user-1"
+    assert row["patient_name"] == "Ada"
+    assert row["patient_email"] == "ada@example.com"
+    assert row["current_question_index"] == 2
+    assert row["consultation_stage"] == "greeting"
+    assert row["created_at"] is not None
+    assert row["updated_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_update_consultation_ignores_unknown_fields(db, db_path) -> None:
+    await db.get_or_create_consultation("s1", "user-1")
+    await db.update_consultation("s1", user_id="other", unknown="value")
+    await db.flush()
+
+    assert read_consultation(db_path, "s1")["user_id"] == "user-1"
+
+
+@pytest.mark.asyncio
+async def test_flush_commits_writes_in_order(db, db_path) -> None:
+    await db.get_or_create_consultation("s1")
+    for stage in ("collecting_basic_info", "collecting_symptoms", "asking_followup_questions"):
+        await db.update_consultation("s1", consultation_stage=stage)
+    for i in range(3):
+        await db.save_patient_response("s1", f"q{i}", f"Question {i}?", "symptom_details", f"a{i}")
+    await db.flush()
+
+    assert read_consultation(db_path, "s1")["consultation_stage"] == "asking_followup_questions"
+    responses = await db.get_consultation_responses("s1")
+    assert [row["response"] for row in responses] == ["a0", "a1", "a2"]
+
+
+@pytest.mark.asyncio
+async def test_summary_lands_after_queued_updates(db, db_path) -> None:
+    await db.get_or_create_consultation("s1")
+    await db.update_consultation("s1", consultation_stage="summary")
+    await db.save_consultation_summary(
+        "s1",
+        "Summary",
+        responses=[
+            {
+                "question_id": "q1",
+                "question_text": "When did it start?",
+                "category": "symptom_details",
+                "response_text": "Yesterday",
+            }
+        ],
+        completed=True,
+        consultation_stage="completed",
+    )
+
+    row = read_consultation(db_path, "s1")
+    assert row["consultation_stage"] == "completed"
+    assert row["completed"] == 1
+    assert [row["response"] for row in await db.get_consultation_responses("s1")] == ["Yesterday"]
+
+
+@pytest.mark.asyncio
+async def test_summary_keeps_response_times(db, db_path) -> None:
+    await db.get_or_create_consultation("s1")
+    answers = [("q1", "2024-05-01 10:00:07", "b"), ("q2", "2024-05-01 10:00:03", "a")]
+    await db.save_consultation_summary(
+        "s1",
+        "Summary",
+        responses=[
+            {
+                "question_id": question_id,
+                "question_text": f"{question_id}?",
+                "category": "symptom_details",
+                "response_text": answer,
+                "response_timestamp": answered_at,
+            }
+            for question_id, answered_at, answer in answers
+        ],
+    )
+    await db.save_patient_response("s1", "q3", "q3?", "symptom_details", "c")
+    await db.save_patient_response("s1", "q4", "q4?", "symptom_details", "d")
+    await db.flush()
+
+    with sqlite3.connect(db_path) as conn:
+        stored = dict(conn.execute("SELECT question_id, response_timestamp FROM patient_responses"))
+    assert stored["q1"] == "2024-05-01 10:00:07"
+    assert stored["q2"] == "2024-05-01 10:00:03"
+    # Responses without a time get the write time, and keep their order when it's the same
+    assert stored["q3"] == stored["q4"] > "2024-05-01"
+    responses = await db.get_consultation_responses("s1")
+    assert [row["response"] for row in responses] == ["a", "b", "c", "d"]
+
+
+@pytest.mark.asyncio
+async def test_batch_keeps_given_timestamps(db, db_path) -> None:
+    await db.get_or_create_consultation("s1")
+    await db._enqueue(
+        SQL_UPSERT_CONSULTATION,
+        {
+            **dict.fromkeys(CONSULTATION_FIELDS),
+            "session_id": "s1",
+            "patient_name": "Ada",
+            "now": "2024-05-01 10:00:00",
+        },
+    )
+    await db.update_consultation("s2", patient_name="Grace")
+    await db.flush()
+
+    assert read_consultation(db_path, "s1")["updated_at"] == "2024-05-01 10:00:00"
+    assert read_consultation(db_path, "s2")["updated_at"] > "2024-05-01 10:00:00"
+
+
+@pytest.mark.asyncio
+async def test_failed_write_does_not_drop_batch(db, db_path) -> None:
+    await db.get_or_create_consultation("s1")
+    await db.update_consultation("s1", patient_name="Ada")
+    # question_text is NOT NULL, so this write fails on its own
+    await db._enqueue(
+        SQL_INSERT_RESPONSE,
+        {
+            "session_id": "s1",
+            "question_id": "q1",
+            "question_text": None,
+            "category": "symptom_details",
+            "response_text": "lost",
+            "symptom_name": None,
+        },
+    )
+    await db.save_patient_response("s1", "q2", "Any fever?", "symptom_details", "No")
+    await db.update_consultation("s1", patient_email="ada@example.com")
+    await db.flush()
+
+    row = read_consultation(db_path, "s1")
+    assert (row["patient_name"], row["patient_email"]) == ("Ada", "ada@example.com")
+    assert [row["response"] for row in await db.get_consultation_responses("s1")] == ["No"]
+
+
+@pytest.mark.asyncio
+async def test_cache_reflects_own_updates(db) -> None:
+    await db.get_or_create_consultation("s1")
+    await db.update_consultation("s1", patient_name="Ada", patient_email=None)
+
+    consultation = await db.get_or_create_consultation("s1")
+    assert consultation["patient_name"] == "Ada"
+    assert consultation["patient_email"] is None
+
+    # Callers get a copy, so changing it doesn't change the cache
+    consultation["patient_name"] = "Changed"
+    assert (await db.get_or_create_consultation("s1"))["patient_name"] == "Ada"
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_by_other_connection(db, db_path) -> None:
+    await db.get_or_create_consultation("s1")
+    await db.update_consultation("s1", patient_name="Ada")
+    assert (await db.get_or_create_consultation("s1"))["patient_name"] == "Ada"
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE patient_consultations SET patient_name = 'Grace'")
+
+    assert (await db.get_or_create_consultation("s1"))["patient_name"] == "Grace"
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_by_other_database_instance(db, db_path) -> None:
+    await db.get_or_create_consultation("s1")
+
+    other = MedicalDatabase(db_path)
+    try:
+        await other.update_consultation("s1", consultation_stage="summary")
+        await other.flush()
+    finally:
+        await other.aclose()
+
+    assert (await db.get_or_create_consultation("s1"))["consultation_stage"] == "summary"
+
+
+@pytest.mark.asyncio
+async def test_aclose_commits_queued_writes(db_path) -> None:
+    db = MedicalDatabase(db_path)
+    await db.get_or_create_consultation("s1")
+    await db.update_consultation("s1", patient_name="Ada")
+    await db.aclose()
+
+    assert read_consultation(db_path, "s1")["patient_name"] == "Ada"
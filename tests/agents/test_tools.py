@@ -0,0 +1,182 @@
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+from agents import tools
+from agents.tools import calculator_func, get_question_priority, parse_symptom_questions
+from memory.knowledge_base import symptom_document
+
+DATASET = Path(__file__).resolve().parents[2] / "data" / "Datasetab94d2b.json"
+SYMPTOMS = json.loads(DATASET.read_text())
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("1 + 2 * 3", "7"),
+        ("7 - 10", "-3"),
+        ("7 / 2", "3.5"),
+        ("7 // 2", "3"),
+        ("7 % 4", "3"),
+        ("2 ** 10", "1024"),
+        ("2 ** -1", "0.5"),
+        ("-(3 + +2)", "-5"),
+        ("  sqrt(16) + abs(-2)  ", "6.0"),
+        ("arctan2(1, 1)", str(math.pi / 4)),
+        ("log(e)", "1.0"),
+        ("2 * pi", str(2 * math.pi)),
+    ],
+)
+def test_calculator_evaluates(expression, expected) -> None:
+    assert calculator_func(expression) == expected
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "__import__('os').system('true')",
+        "(1).__class__",
+        "[1, 2]",
+        "'a' * 3",
+        "True + 1",
+        "x + 1",
+        "sqrt(x=4)",
+        "open('setup.py')",
+        "1 if 1 else 2",
+        "lambda: 1",
+        "1 << 8",
+        "1; 2",
+    ],
+)
+def test_calculator_rejects_anything_else(expression) -> None:
+    with pytest.raises(ValueError):
+        calculator_func(expression)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["9 ** 9 ** 9", "(9 ** 4000) ** 4000", "2 ** 13000 * 2 ** 13000", "10 ** 4500"],
+)
+def test_calculator_refuses_huge_integers(expression) -> None:
+    with pytest.raises(ValueError, match="too large"):
+        calculator_func(expression)
+
+
+def test_calculator_allows_large_results_within_bounds() -> None:
+    assert calculator_func("2 ** 10000") == str(2**10000)
+    assert calculator_func("1 ** 1000000") == "1"
+    assert calculator_func("(-1) ** 1000001") == "-1"
+    assert calculator_func("2.0 ** 0.5") == str(2.0**0.5)
+
+
+def test_parse_symptom_questions_reads_dataset_document() -> None:
+    item = next(item for item in SYMPTOMS if item["symptom"] == "Chest Pain / Discomfort")
+    parsed = parse_symptom_questions(symptom_document(item).page_content, item["symptom"])
+
+    assert parsed["symptom"] == "Chest Pain / Discomfort"
+    assert parsed["categories"] == [
+        "Symptom Details Questions",
+        "Vital Signs Questions",
+        "Medical History Questions",
+        "Past Medical History Questions",
+        "Lifestyle Risk Factors Questions",
+        "Red Flags Questions",
+        "Psychosocial Questions",
+    ]
+    assert parsed["total_questions"] == 18
+    by_category = parsed["questions_by_category"]
+    assert {category: len(questions) for category, questions in by_category.items()} == {
+        "Symptom Details Questions": 5,
+        "Vital Signs Questions": 2,
+        "Medical History Questions": 2,
+        "Past Medical History Questions": 2,
+        "Lifestyle Risk Factors Questions": 3,
+        "Red Flags Questions": 2,
+        "Psychosocial Questions": 2,
+    }
+    assert by_category["Red Flags Questions"] == [
+        {
+            "text": "Is the chest pain sudden and severe, described as a 'tearing' sensation?",
+            "category": "Red Flags Questions",
+            "priority": 1,
+        },
+        {
+            "text": "Is it associated with profuse sweating, nausea, or sudden shortness of breath?",
+            "category": "Red Flags Questions",
+            "priority": 1,
+        },
+    ]
+    # The "-----" separators and the keywords line aren't questions
+    texts = [question["text"] for questions in by_category.values() for question in questions]
+    assert not any(text.startswith("-") or "Searchable" in text for text in texts)
+    assert [question["category"] for question in parsed["prioritized_questions"][:3]] == [
+        "Red Flags Questions",
+        "Red Flags Questions",
+        "Vital Signs Questions",
+    ]
+
+
+@pytest.mark.parametrize("item", SYMPTOMS, ids=[item["symptom"] for item in SYMPTOMS])
+def test_parse_symptom_questions_returns_dataset_questions(item) -> None:
+    parsed = parse_symptom_questions(symptom_document(item).page_content, item["symptom"])
+
+    assert {
+        category: [question["text"] for question in questions]
+        for category, questions in parsed["questions_by_category"].items()
+    } == {
+        f"{category.replace('_', ' ').title()} Questions": questions
+        for category, questions in item["follow_up_questions"].items()
+    }
+
+
+def test_parse_symptom_questions_accepts_any_list_number() -> None:
+    content = "\n".join(
+        [
+            "Medical Symptom: Cough",
+            "Symptom Details Questions:",
+            "-" * 40,
+            *(f"{i}. How long has question {i} applied?" for i in range(1, 8)),
+            "- Is the cough worse at night?",
+            "Do you cough up blood?",
+            "Too short?",
+        ]
+    )
+    questions = parse_symptom_questions(content, "Cough")["questions_by_category"]
+
+    assert [question["text"] for question in questions["Symptom Details Questions"]] == [
+        *(f"How long has question {i} applied?" for i in range(1, 8)),
+        "Is the cough worse at night?",
+        "Do you cough up blood?",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("category", "expected"),
+    [
+        ("Red Flags Questions", 1),
+        ("Vital Signs Questions", 2),
+        ("Symptom Details Questions", 3),
+        ("Medical History Questions", 4),
+        ("Past Medical History Questions", 5),
+        ("Lifestyle Risk Factors Questions", 6),
+        ("Psychosocial Questions", 7),
+        ("RED FLAGS QUESTIONS", 1),
+        ("Red flag symptoms", 1),
+        ("Past medical history (details)", 5),
+        ("Family Questions", 8),
+        ("Questions", 8),
+    ],
+)
+def test_get_question_priority(category, expected) -> None:
+    assert get_question_priority(category) == expected
+
+
+def test_get_question_priority_does_not_depend_on_call_history() -> None:
+    known = dict(tools._CATEGORY_PRIORITY)
+    for category in ("Unknown Questions", "Red flag symptoms", "Unknown Questions"):
+        get_question_priority(category)
+
+    assert tools._CATEGORY_PRIORITY == known
+    assert get_question_priority("Unknown Questions") == 8
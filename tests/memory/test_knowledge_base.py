@@ -0,0 +1,66 @@
+import chromadb
+import pytest
+
+from memory.knowledge_base import (
+    HNSW_COLLECTION_METADATA,
+    check_collection_metadata,
+    check_embedding_backend,
+    collection_metadata,
+)
+
+
+@pytest.fixture
+def client(tmp_path):
+    return chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+
+
+def test_store_opened_with_its_own_backend(client) -> None:
+    client.create_collection("langchain", metadata=collection_metadata("huggingface"))
+    collection = client.get_or_create_collection(
+        "langchain", metadata=collection_metadata("huggingface")
+    )
+
+    check_embedding_backend(collection.metadata, "huggingface")
+
+
+def test_store_refused_for_other_backend(client) -> None:
+    client.create_collection("langchain", metadata=collection_metadata("huggingface"))
+    # Metadata passed when opening an existing collection doesn't replace what it was created with
+    collection = client.get_or_create_collection(
+        "langchain", metadata=collection_metadata("openai")
+    )
+
+    with pytest.raises(RuntimeError, match="--rebuild --embeddings openai"):
+        check_embedding_backend(collection.metadata, "openai")
+
+
+def test_store_without_recorded_backend_is_openai(client) -> None:
+    collection = client.create_collection("langchain")
+
+    check_embedding_backend(collection.metadata, "openai")
+    with pytest.raises(RuntimeError, match="built with openai embeddings"):
+        check_embedding_backend(collection.metadata, "huggingface")
+
+
+def test_existing_store_with_same_settings_accepted(client) -> None:
+    client.create_collection("langchain", metadata=collection_metadata("openai"))
+    collection = client.get_or_create_collection(
+        "langchain", metadata=collection_metadata("openai")
+    )
+
+    check_collection_metadata(collection.metadata, "openai")
+
+
+@pytest.mark.parametrize(
+    "metadata",
+    [None, {**HNSW_COLLECTION_METADATA, "hnsw:M": 16}, {"hnsw:space": "l2"}],
+    ids=["default", "other-M", "l2"],
+)
+def test_existing_store_with_other_hnsw_settings_refused(client, metadata) -> None:
+    client.create_collection("langchain", metadata=metadata)
+    collection = client.get_or_create_collection(
+        "langchain", metadata=collection_metadata("openai")
+    )
+
+    with pytest.raises(RuntimeError, match="--rebuild"):
+        check_collection_metadata(collection.metadata, "openai")
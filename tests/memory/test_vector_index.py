@@ -0,0 +1,60 @@
+import chromadb
+import pytest
+
+from memory.vector_index import check_faiss_index_current, chroma_fingerprint, write_faiss_source
+
+
+@pytest.fixture
+def chroma_dir(tmp_path):
+    path = str(tmp_path / "chroma")
+    collection = chromadb.PersistentClient(path=path).get_or_create_collection("langchain")
+    collection.add(ids=["a"], embeddings=[[1.0, 0.0]], documents=["first"])
+    return path
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    path = tmp_path / "faiss"
+    path.mkdir()
+    return str(path)
+
+
+def test_current_index_accepted(chroma_dir, index_dir) -> None:
+    write_faiss_source(index_dir, chroma_fingerprint(chroma_dir), "openai")
+    # Opening the store and reading from it doesn't make the index stale
+    chromadb.PersistentClient(path=chroma_dir).get_collection("langchain").get()
+
+    check_faiss_index_current(index_dir, chroma_dir, "openai")
+
+
+def test_index_without_source_refused(chroma_dir, index_dir) -> None:
+    with pytest.raises(RuntimeError, match="build_faiss_index.py"):
+        check_faiss_index_current(index_dir, chroma_dir, "openai")
+
+
+def test_index_refused_after_chroma_write(chroma_dir, index_dir) -> None:
+    write_faiss_source(index_dir, chroma_fingerprint(chroma_dir), "openai")
+    collection = chromadb.PersistentClient(path=chroma_dir).get_collection("langchain")
+    collection.add(ids=["b"], embeddings=[[0.0, 1.0]], documents=["second"])
+
+    with pytest.raises(RuntimeError, match="older than the Chroma store"):
+        check_faiss_index_current(index_dir, chroma_dir, "openai")
+
+
+def test_index_refused_after_chroma_rebuild(chroma_dir, index_dir) -> None:
+    write_faiss_source(index_dir, chroma_fingerprint(chroma_dir), "openai")
+    client = chromadb.PersistentClient(path=chroma_dir)
+    client.delete_collection("langchain")
+    client.create_collection("langchain").add(
+        ids=["a"], embeddings=[[1.0, 0.0]], documents=["first"]
+    )
+
+    with pytest.raises(RuntimeError, match="older than the Chroma store"):
+        check_faiss_index_current(index_dir, chroma_dir, "openai")
+
+
+def test_index_refused_for_other_embedding_backend(chroma_dir, index_dir) -> None:
+    write_faiss_source(index_dir, chroma_fingerprint(chroma_dir), "huggingface")
+
+    with pytest.raises(RuntimeError, match="EMBEDDING_BACKEND=huggingface"):
+        check_faiss_index_current(index_dir, chroma_dir, "openai")